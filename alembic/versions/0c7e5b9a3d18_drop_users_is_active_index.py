@@ -0,0 +1,29 @@
+"""Drop users is_active index
+
+Revision ID: 0c7e5b9a3d18
+Revises: f4a8c2d6e013
+Create Date: 2026-10-15 16:40:05.283917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7e5b9a3d18'
+down_revision: Union[str, None] = 'f4a8c2d6e013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # No query filters users by is_active alone, and a boolean index is
+    # too unselective for the planner to use; the users table may predate
+    # migrations, so the index is not guaranteed to exist
+    op.execute('DROP INDEX IF EXISTS ix_users_is_active')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_is_active', 'users', ['is_active'], unique=False)
@@ -0,0 +1,34 @@
+"""Add predictions (model_id, created_at) index
+
+Revision ID: 2b9e7c4d1f86
+Revises: 8d3b6f0a2c71
+Create Date: 2026-10-15 14:07:52.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b9e7c4d1f86'
+down_revision: Union[str, None] = '8d3b6f0a2c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_predictions_model_id_created_at',
+        'predictions',
+        ['model_id', sa.text('created_at DESC')],
+        unique=False
+    )
+    # Redundant with the composite indexes that lead with model_id
+    op.drop_index('ix_predictions_model_id', table_name='predictions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_predictions_model_id', 'predictions', ['model_id'], unique=False)
+    op.drop_index('ix_predictions_model_id_created_at', table_name='predictions')
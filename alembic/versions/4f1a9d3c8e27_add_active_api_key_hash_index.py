@@ -0,0 +1,32 @@
+"""Add partial index on active API key hashes
+
+Revision ID: 4f1a9d3c8e27
+Revises: b7e2c41d5a90
+Create Date: 2026-10-15 09:47:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a9d3c8e27'
+down_revision: Union[str, None] = 'b7e2c41d5a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_api_keys_key_hash_active',
+        'api_keys',
+        ['key_hash'],
+        unique=False,
+        postgresql_where=sa.text('is_active = true')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_api_keys_key_hash_active', table_name='api_keys')
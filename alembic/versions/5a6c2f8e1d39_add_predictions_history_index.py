@@ -0,0 +1,31 @@
+"""Add predictions history keyset index
+
+Revision ID: 5a6c2f8e1d39
+Revises: e91b07a4d2f3
+Create Date: 2026-10-15 11:38:26.742019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a6c2f8e1d39'
+down_revision: Union[str, None] = 'e91b07a4d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_predictions_user_id_created_at',
+        'predictions',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_user_id_created_at', table_name='predictions')
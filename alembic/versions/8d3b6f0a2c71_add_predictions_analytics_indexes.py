@@ -0,0 +1,39 @@
+"""Add predictions analytics indexes
+
+Revision ID: 8d3b6f0a2c71
+Revises: 5a6c2f8e1d39
+Create Date: 2026-10-15 12:21:09.318542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6f0a2c71'
+down_revision: Union[str, None] = '5a6c2f8e1d39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_predictions_model_id_status_created_at',
+        'predictions',
+        ['model_id', 'status', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_predictions_model_id_failed',
+        'predictions',
+        ['model_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text("status = 'failed'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_model_id_failed', table_name='predictions')
+    op.drop_index('ix_predictions_model_id_status_created_at', table_name='predictions')
@@ -0,0 +1,31 @@
+"""Add models keyset pagination index
+
+Revision ID: b7e2c41d5a90
+Revises: 9ce9de73688d
+Create Date: 2026-10-15 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c41d5a90'
+down_revision: Union[str, None] = '9ce9de73688d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_models_user_id_created_at',
+        'models',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_models_user_id_created_at', table_name='models')
@@ -0,0 +1,41 @@
+"""Store API key hash as raw bytes
+
+Revision ID: e91b07a4d2f3
+Revises: c3d85e1f0b64
+Create Date: 2026-10-15 11:02:45.310877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b07a4d2f3'
+down_revision: Union[str, None] = 'c3d85e1f0b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing hashes are hex-encoded SHA-256 digests
+    op.alter_column(
+        'api_keys',
+        'key_hash',
+        existing_type=sa.String(length=255),
+        type_=sa.LargeBinary(length=32),
+        existing_nullable=False,
+        postgresql_using="decode(key_hash, 'hex')"
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'api_keys',
+        'key_hash',
+        existing_type=sa.LargeBinary(length=32),
+        type_=sa.String(length=255),
+        existing_nullable=False,
+        postgresql_using="encode(key_hash, 'hex')"
+    )
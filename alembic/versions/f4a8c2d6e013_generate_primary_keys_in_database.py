@@ -0,0 +1,35 @@
+"""Generate primary keys in the database
+
+Revision ID: f4a8c2d6e013
+Revises: 2b9e7c4d1f86
+Create Date: 2026-10-15 16:12:38.417205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a8c2d6e013'
+down_revision: Union[str, None] = '2b9e7c4d1f86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'models', 'predictions', 'api_keys')
+
+
+def upgrade() -> None:
+    # gen_random_uuid() is built in from PostgreSQL 13; pgcrypto provides it before that
+    op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('gen_random_uuid()'))
+        # Duplicates the primary key index; not every database has it
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_id')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+        op.alter_column(table, 'id', server_default=None)
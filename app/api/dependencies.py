@@ -2,38 +2,127 @@
 Shared API dependencies
 Provides common dependencies like authentication and database sessions
 """
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status, Header
+from typing import Any, Callable, Dict, Generator, Optional, Type, TypeVar
+from fastapi import Depends, HTTPException, status, Header, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from datetime import datetime, timezone
-import hashlib
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, raiseload
+import contextlib
+import threading
+import time
 
 from app.db.session import get_db
-from app.core.security import verify_token
+from app.core.security import verify_token, hash_api_key
+from app.core.api_key_cache import api_key_cache, CachedAPIKey
+from app.core.api_key_usage import api_key_usage_tracker
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.models.api_key import APIKey
 
 # Security scheme for JWT Bearer tokens (auto_error=False to allow API key auth)
 security = HTTPBearer(auto_error=False)
 
+# One lock per API key hash being looked up, so a burst of requests with a
+# key that is not cached yet runs a single database query; the others wait
+# and are served from the API key cache
+_lookup_locks: Dict[bytes, threading.Lock] = {}
+_lookup_locks_guard = threading.Lock()
 
-def hash_api_key(api_key: str) -> str:
-    """Hash an API key for lookup"""
-    return hashlib.sha256(api_key.encode()).hexdigest()
+
+def load_user(db: Session, user_id) -> Optional[User]:
+    """
+    Load an authenticated user, trying the Redis user cache first
+    
+    Args:
+        db: Database session
+        user_id: User ID from a token or cached API key
+    
+    Returns:
+        User object (detached when served from cache), or None if not found
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        user = db.get(User, user_id)
+        if user is not None:
+            user_cache.set(user)
+    return user
 
 
-async def get_user_from_api_key(
+@contextlib.contextmanager
+def _single_flight(key_hash: bytes):
+    """Hold the lookup lock for a key hash, dropping it once the lookup is done"""
+    with _lookup_locks_guard:
+        lock = _lookup_locks.setdefault(key_hash, threading.Lock())
+    with lock:
+        try:
+            yield
+        finally:
+            with _lookup_locks_guard:
+                _lookup_locks.pop(key_hash, None)
+
+
+def _lookup_api_key(db: Session, key_hash: bytes, now: float) -> Optional[User]:
+    """
+    Authenticate an API key from the database and cache it
+    
+    Args:
+        db: Database session
+        key_hash: Hash of the API key
+        now: Request time as a Unix timestamp
+    
+    Returns:
+        User object if valid API key, None otherwise
+    """
+    # Look up API key and its owner in a single query; nothing on this path
+    # should lazy load (the owner's models, predictions, other keys)
+    api_key_record = db.execute(
+        select(APIKey)
+        .options(joinedload(APIKey.user).raiseload("*"), raiseload("*"))
+        .where(APIKey.key_hash == key_hash, APIKey.is_active == True)
+    ).scalar_one_or_none()
+    
+    if not api_key_record:
+        return None
+    
+    # Check if key is expired
+    if api_key_record.expires_at:
+        if api_key_record.expires_at.timestamp() < now:
+            return None
+    
+    # Queue last_used_at update (flushed in batches)
+    api_key_usage_tracker.record(api_key_record.id, now)
+    
+    user_cache.set(api_key_record.user)
+    api_key_cache.set(
+        key_hash,
+        CachedAPIKey(
+            id=api_key_record.id,
+            user_id=api_key_record.user_id,
+            expires_at=api_key_record.expires_at.timestamp() if api_key_record.expires_at else None
+        )
+    )
+    
+    return api_key_record.user
+
+
+def get_user_from_api_key(
     x_api_key: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
     """
     Get user from API key header
     
+    Recently used keys are served from an in-memory cache, so only the
+    user row is loaded on a hit. last_used_at is buffered and written in
+    batches by the usage tracker instead of committing on every request.
+    Concurrent misses for the same key share a single database lookup.
+    
     Args:
         x_api_key: API key from X-API-Key header
         db: Database session
-        
+    
     Returns:
         User object if valid API key, None otherwise
     """
@@ -42,32 +131,31 @@ async def get_user_from_api_key(
     
     # Hash the API key
     key_hash = hash_api_key(x_api_key)
+    now = time.time()
     
-    # Look up API key in database
-    api_key_record = db.query(APIKey).filter(
-        APIKey.key_hash == key_hash,
-        APIKey.is_active == True
-    ).first()
+    # Serve from cache when possible
+    cached = api_key_cache.get(key_hash)
+    if cached is None:
+        with _single_flight(key_hash):
+            # Another request may have cached the key while we waited
+            cached = api_key_cache.get(key_hash)
+            if cached is None:
+                return _lookup_api_key(db, key_hash, now)
     
-    if not api_key_record:
+    if cached.expires_at is not None and cached.expires_at < now:
+        api_key_cache.invalidate(key_hash)
         return None
     
-    # Check if key is expired
-    if api_key_record.expires_at:
-        now = datetime.now(timezone.utc)
-        if api_key_record.expires_at < now:
-            return None
-    
-    # Update last_used_at
-    api_key_record.last_used_at = datetime.now(timezone.utc)
-    db.commit()
+    user = load_user(db, cached.user_id)
+    if not user:
+        api_key_cache.invalidate(key_hash)
+        return None
     
-    # Get and return user
-    user = db.query(User).filter(User.id == api_key_record.user_id).first()
+    api_key_usage_tracker.record(cached.id, now)
     return user
 
 
-async def get_current_user(
+def get_current_user(
     db: Session = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     x_api_key: Optional[str] = Header(None, alias="X-API-Key")
@@ -81,13 +169,13 @@ async def get_current_user(
         credentials: JWT token from Authorization header
         x_api_key: API key from X-API-Key header
         db: Database session
-        
+    
     Returns:
         Authenticated user object
-        
+    
     Raises:
         HTTPException: If neither auth method is valid
-        
+    
     Usage:
         @router.get("/protected")
         async def protected_route(current_user: User = Depends(get_current_user)):
@@ -95,7 +183,7 @@ async def get_current_user(
     """
     # Try API key first
     if x_api_key:
-        user = await get_user_from_api_key(x_api_key, db)
+        user = get_user_from_api_key(x_api_key, db)
         if user:
             if not user.is_active:
                 raise HTTPException(
@@ -126,8 +214,8 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # Get user from cache or database
+    user = load_user(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -152,10 +240,10 @@ async def get_current_active_user(
     
     Args:
         current_user: Current user from get_current_user
-        
+    
     Returns:
         Active user object
-        
+    
     Raises:
         HTTPException: If user is inactive
     """
@@ -175,10 +263,10 @@ async def get_current_admin_user(
     
     Args:
         current_user: Current user from get_current_user
-        
+    
     Returns:
         Admin user object
-        
+    
     Raises:
         HTTPException: If user is not an admin
     """
@@ -188,3 +276,46 @@ async def get_current_admin_user(
             detail="Admin access required"
         )
     return current_user
+
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def json_body(schema: Type[SchemaT]) -> Callable[[Request], Any]:
+    """
+    Dependency that parses a JSON request body straight into a schema
+    
+    model_validate_json parses and validates the raw bytes in one pass,
+    instead of FastAPI decoding the JSON into Python objects and then
+    validating those. Errors are reported as the usual 422 response.
+    
+    Args:
+        schema: Pydantic model describing the body
+    
+    Returns:
+        Async dependency returning a validated schema instance
+    
+    Usage:
+        @router.post("/items", openapi_extra=json_body_openapi(ItemCreate))
+        def create_item(item: ItemCreate = Depends(json_body(ItemCreate))):
+            ...
+    """
+    async def parse(request: Request) -> SchemaT:
+        try:
+            return schema.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+    
+    return parse
+
+
+def json_body_openapi(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for routes that parse their body with json_body"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema.model_json_schema()}}
+        }
+    }
@@ -0,0 +1,47 @@
+"""
+Keyset pagination helpers
+Encodes and decodes opaque cursors for (created_at, id) ordered listings
+"""
+from datetime import datetime
+from uuid import UUID
+import base64
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+    
+    Args:
+        created_at: Creation timestamp of the last row
+        row_id: Primary key of the last row (tie-breaker)
+    
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Args:
+        cursor: Cursor string from a previous response
+    
+    Returns:
+        Tuple of (created_at, id)
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
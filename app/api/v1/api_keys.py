@@ -4,10 +4,11 @@ Handles creation, listing, and revocation of API keys
 """
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import secrets
-import hashlib
 
 from app.db.session import get_db
 from app.models.user import User
@@ -19,23 +20,24 @@ from app.schemas.api_key import (
     APIKeyListResponse,
     APIKeyUpdate
 )
+from app.schemas.serialization import dump_row
 from app.api.dependencies import get_current_user
+from app.core.security import hash_api_key
+from app.core.api_key_cache import api_key_cache
 
 router = APIRouter(prefix="/api-keys", tags=["API Keys"])
 
+# Shown in place of stored keys, which only exist as hashes
+MASKED_KEY_PREFIX = "mlp_" + "*" * 8
+
 
 def generate_api_key() -> str:
     """Generate a secure random API key"""
     return f"mlp_{secrets.token_urlsafe(32)}"
 
 
-def hash_api_key(api_key: str) -> str:
-    """Hash an API key for storage"""
-    return hashlib.sha256(api_key.encode()).hexdigest()
-
-
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def create_api_key(
+def create_api_key(
     key_data: APIKeyCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -57,7 +59,7 @@ async def create_api_key(
     # Calculate expiration
     expires_at = None
     if key_data.expires_days:
-        expires_at = datetime.utcnow() + timedelta(days=key_data.expires_days)
+        expires_at = datetime.now(timezone.utc) + timedelta(days=key_data.expires_days)
     
     # Create database record
     db_api_key = APIKey(
@@ -86,7 +88,7 @@ async def create_api_key(
 
 
 @router.get("", response_model=dict)
-async def list_api_keys(
+def list_api_keys(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -97,28 +99,34 @@ async def list_api_keys(
     
     Returns list of API keys (without the actual keys)
     """
-    api_keys = db.query(APIKey).filter(APIKey.user_id == current_user.id).all()
-    
-    keys_list = []
-    for key in api_keys:
-        keys_list.append({
-            "id": str(key.id),
-            "name": key.name,
-            "is_active": key.is_active,
-            "last_used_at": key.last_used_at.isoformat() if key.last_used_at else None,
-            "expires_at": key.expires_at.isoformat() if key.expires_at else None,
-            "created_at": key.created_at.isoformat(),
-            "prefix": "mlp_" + "*" * 8  # Show prefix only
-        })
+    # Select only the listed columns as plain rows: no ORM instances to
+    # build, and the key hash is never read
+    rows = db.execute(
+        select(
+            APIKey.id,
+            APIKey.name,
+            APIKey.is_active,
+            APIKey.last_used_at,
+            APIKey.expires_at,
+            APIKey.created_at
+        ).where(APIKey.user_id == current_user.id)
+    )
     
-    return {
+    keys_list = [
+        {**row._mapping, "prefix": MASKED_KEY_PREFIX}  # Show prefix only
+        for row in rows
+    ]
+    
+    # Returned directly so orjson encodes the UUIDs and datetimes without
+    # FastAPI's validation and jsonable_encoder passes
+    return ORJSONResponse({
         "success": True,
         "data": keys_list
-    }
+    })
 
 
 @router.get("/{key_id}", response_model=dict)
-async def get_api_key(
+def get_api_key(
     key_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -130,7 +138,11 @@ async def get_api_key(
     
     Requires authentication and ownership
     """
-    api_key = db.query(APIKey).filter(APIKey.id == key_id).first()
+    # Ownership is part of the lookup; other users' API keys are reported as not found
+    api_key = db.query(APIKey).filter(
+        APIKey.id == key_id,
+        APIKey.user_id == current_user.id
+    ).first()
     
     if not api_key:
         raise HTTPException(
@@ -138,20 +150,14 @@ async def get_api_key(
             detail="API key not found"
         )
     
-    if api_key.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this API key"
-        )
-    
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": APIKeyResponse.model_validate(api_key).model_dump()
-    }
+        "data": dump_row(api_key, APIKeyResponse)
+    })
 
 
 @router.patch("/{key_id}", response_model=dict)
-async def update_api_key(
+def update_api_key(
     key_id: str,
     key_update: APIKeyUpdate,
     current_user: User = Depends(get_current_user),
@@ -166,7 +172,10 @@ async def update_api_key(
     
     Requires authentication and ownership
     """
-    api_key = db.query(APIKey).filter(APIKey.id == key_id).first()
+    api_key = db.query(APIKey).filter(
+        APIKey.id == key_id,
+        APIKey.user_id == current_user.id
+    ).first()
     
     if not api_key:
         raise HTTPException(
@@ -174,12 +183,6 @@ async def update_api_key(
             detail="API key not found"
         )
     
-    if api_key.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this API key"
-        )
-    
     # Update fields
     if key_update.name is not None:
         api_key.name = key_update.name
@@ -187,17 +190,18 @@ async def update_api_key(
         api_key.is_active = key_update.is_active
     
     db.commit()
+    api_key_cache.invalidate(api_key.key_hash)
     db.refresh(api_key)
     
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": APIKeyResponse.model_validate(api_key).model_dump(),
+        "data": dump_row(api_key, APIKeyResponse),
         "message": "API key updated successfully"
-    }
+    })
 
 
 @router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def revoke_api_key(
+def revoke_api_key(
     key_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -211,7 +215,10 @@ async def revoke_api_key(
     
     This permanently deletes the API key
     """
-    api_key = db.query(APIKey).filter(APIKey.id == key_id).first()
+    api_key = db.query(APIKey).filter(
+        APIKey.id == key_id,
+        APIKey.user_id == current_user.id
+    ).first()
     
     if not api_key:
         raise HTTPException(
@@ -219,13 +226,9 @@ async def revoke_api_key(
             detail="API key not found"
         )
     
-    if api_key.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this API key"
-        )
-    
+    key_hash = api_key.key_hash
     db.delete(api_key)
     db.commit()
+    api_key_cache.invalidate(key_hash)
     
     return None
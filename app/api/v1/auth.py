@@ -4,11 +4,13 @@ Handles user registration, login, token refresh
 """
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, undefer
 
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
+from app.schemas.serialization import dump_row
 from app.core.security import (
     get_password_hash,
     verify_password,
@@ -23,7 +25,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def register(
+def register(
     user_data: UserCreate,
     db: Session = Depends(get_db)
 ):
@@ -58,14 +60,14 @@ async def register(
     return {
         "success": True,
         "data": {
-            "user": UserResponse.model_validate(new_user)
+            "user": dump_row(new_user, UserResponse)
         },
         "message": "User registered successfully"
     }
 
 
 @router.post("/login", response_model=dict)
-async def login(
+def login(
     credentials: UserLogin,
     db: Session = Depends(get_db)
 ):
@@ -78,7 +80,9 @@ async def login(
     Returns access token, refresh token, and user information
     """
     # Find user
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = db.query(User).options(undefer(User.hashed_password)).filter(
+        User.email == credentials.email
+    ).first()
     
     if not user or not verify_password(credentials.password, user.hashed_password):
         raise HTTPException(
@@ -106,7 +110,7 @@ async def login(
             "refresh_token": refresh_token,
             "token_type": "bearer",
             "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            "user": UserResponse.model_validate(user)
+            "user": dump_row(user, UserResponse)
         },
         "message": "Login successful"
     }
@@ -161,7 +165,7 @@ async def get_current_user_info(
     
     Returns user profile information
     """
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": UserResponse.model_validate(current_user)
-    }
+        "data": dump_row(current_user, UserResponse)
+    })
@@ -5,25 +5,105 @@ Monitors system health and service availability
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from typing import Any, Dict, Optional
+import asyncio
 import os
 from datetime import datetime
 from pathlib import Path
 
-from app.db.session import get_db
+from app.db.session import get_db, engine
 from app.core.config import settings
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
+# How often the upload directory is re-probed in the background
+FILE_SYSTEM_PROBE_INTERVAL_SECONDS = 30
+
+_file_system_health: Optional[Dict[str, Any]] = None
+_file_system_monitor: Optional[asyncio.Task] = None
+
+
+def probe_file_system() -> Dict[str, Any]:
+    """
+    Check that the upload directory exists and is writable
+    
+    Stores the result so health checks can report it without touching disk
+    
+    Returns:
+        File system component status
+    """
+    global _file_system_health
+    
+    try:
+        upload_dir = Path(settings.UPLOAD_DIR)
+        
+        # Check if directory exists
+        if not upload_dir.exists():
+            os.makedirs(upload_dir, exist_ok=True)
+        
+        # Check if directory is writable
+        test_file = upload_dir / ".health_check"
+        test_file.touch()
+        test_file.unlink()
+        
+        result = {
+            "status": "healthy",
+            "message": "File system accessible",
+            "upload_dir": str(upload_dir)
+        }
+    except Exception as e:
+        result = {
+            "status": "unhealthy",
+            "message": f"File system error: {str(e)}"
+        }
+    
+    result["checked_at"] = datetime.utcnow().isoformat()
+    _file_system_health = result
+    return result
+
+
+def get_file_system_health() -> Dict[str, Any]:
+    """Get the last file system probe result, probing once if none exists yet"""
+    if _file_system_health is None:
+        return probe_file_system()
+    return _file_system_health
+
+
+async def _monitor_file_system():
+    """Periodically re-probe the file system"""
+    while True:
+        await asyncio.to_thread(probe_file_system)
+        await asyncio.sleep(FILE_SYSTEM_PROBE_INTERVAL_SECONDS)
+
+
+def start_file_system_monitor():
+    """Start the background file system probe"""
+    global _file_system_monitor
+    if _file_system_monitor is None:
+        _file_system_monitor = asyncio.create_task(_monitor_file_system())
+
+
+async def stop_file_system_monitor():
+    """Stop the background file system probe"""
+    global _file_system_monitor
+    if _file_system_monitor is not None:
+        _file_system_monitor.cancel()
+        try:
+            await _file_system_monitor
+        except asyncio.CancelledError:
+            pass
+        _file_system_monitor = None
+
 
 @router.get("")
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """
     Comprehensive health check endpoint
     
     Checks:
     - API availability
     - Database connectivity
-    - File system accessibility
+    - File system accessibility (cached result of the background probe)
     - Upload directory
     
     Returns overall health status and component details
@@ -45,7 +125,8 @@ async def health_check(db: Session = Depends(get_db)):
         db.execute(text("SELECT 1"))
         health_status["components"]["database"] = {
             "status": "healthy",
-            "message": "Database connection successful"
+            "message": "Database connection successful",
+            "pool": engine.pool.status()
         }
     except Exception as e:
         health_status["status"] = "unhealthy"
@@ -54,30 +135,11 @@ async def health_check(db: Session = Depends(get_db)):
             "message": f"Database connection failed: {str(e)}"
         }
     
-    # Check file system and upload directory
-    try:
-        upload_dir = Path(settings.UPLOAD_DIR)
-        
-        # Check if directory exists
-        if not upload_dir.exists():
-            os.makedirs(upload_dir, exist_ok=True)
-        
-        # Check if directory is writable
-        test_file = upload_dir / ".health_check"
-        test_file.touch()
-        test_file.unlink()
-        
-        health_status["components"]["file_system"] = {
-            "status": "healthy",
-            "message": "File system accessible",
-            "upload_dir": str(upload_dir)
-        }
-    except Exception as e:
+    # File system status comes from the background probe
+    file_system_health = get_file_system_health()
+    if file_system_health["status"] != "healthy":
         health_status["status"] = "unhealthy"
-        health_status["components"]["file_system"] = {
-            "status": "unhealthy",
-            "message": f"File system error: {str(e)}"
-        }
+    health_status["components"]["file_system"] = file_system_health
     
     # Return appropriate status code
     if health_status["status"] == "unhealthy":
@@ -90,7 +152,7 @@ async def health_check(db: Session = Depends(get_db)):
 
 
 @router.get("/ready")
-async def readiness_check(db: Session = Depends(get_db)):
+def readiness_check(db: Session = Depends(get_db)):
     """
     Kubernetes readiness probe endpoint
     
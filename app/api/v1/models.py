@@ -2,10 +2,18 @@
 Model management endpoints
 Handles model upload, versioning, listing, and deletion
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import and_, desc, func, select, tuple_
+from datetime import datetime
+from functools import lru_cache
+from uuid import UUID
+import aiofiles
+import contextlib
+import hashlib
 import os
 import uuid as uuid_lib
 
@@ -15,18 +23,121 @@ from app.models.model import Model
 from app.models.prediction import Prediction
 from app.schemas.model import (
     ModelResponse,
-    ModelListResponse,
     ModelUpdate,
     ModelUploadResponse
 )
+from app.schemas.serialization import dump_row
 from app.api.dependencies import get_current_user
+from app.api.pagination import encode_cursor, decode_cursor
 from app.core.config import settings
+from app.core.model_compiler import compile_to_onnx
 
 router = APIRouter(prefix="/models", tags=["Models"])
 
+# Read uploads in 1 MB chunks instead of buffering the whole file
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _model_to_dict(model: Model) -> dict:
+    """Serialize a Model row in the ModelResponse shape"""
+    return dump_row(model, ModelResponse)
+
+
+@lru_cache(maxsize=1024)
+def _ensure_dir(path: str) -> str:
+    """Create a storage directory once per process instead of on every upload"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _storage_path(content_hash: str) -> str:
+    """
+    Content-addressed location of a model file
+    
+    Files live at UPLOAD_DIR/ab/cd/<sha256>.pkl. The two-level fanout keeps
+    every directory small, and identical uploads map to the same file.
+    """
+    shard = _ensure_dir(os.path.join(settings.UPLOAD_DIR, content_hash[:2], content_hash[2:4]))
+    return os.path.join(shard, f"{content_hash}.pkl")
+
+
+def _next_version(db: Session, user_id: UUID, name: str) -> int:
+    """Version number for the next upload of a model name"""
+    latest_model = db.query(Model).filter(
+        Model.user_id == user_id,
+        Model.name == name
+    ).order_by(desc(Model.version)).first()
+    
+    return 1 if not latest_model else latest_model.version + 1
+
+
+def _publish_upload(tmp_path: str, content_hash: str) -> str:
+    """
+    Move a fully received upload to its content-addressed location
+    
+    Args:
+        tmp_path: Temporary file holding the upload
+        content_hash: SHA-256 of the file's bytes
+    
+    Returns:
+        Final path of the model file
+    """
+    file_path = _storage_path(content_hash)
+    
+    if os.path.exists(file_path):
+        # Identical bytes are already stored; share the existing file
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+    else:
+        # Publish the complete file atomically so readers never see a partial model
+        os.replace(tmp_path, file_path)
+    
+    return file_path
+
+
+def _save_model(db: Session, model: Model) -> Model:
+    """Insert a model record and reload its server-generated columns"""
+    db.add(model)
+    db.commit()
+    db.refresh(model)
+    return model
+
+
+def _get_owned_model(db: Session, model_id: str, user_id: UUID) -> Model:
+    """
+    Look up a model owned by a user in a single query
+    
+    Ownership is part of the WHERE clause, so other users' models are
+    reported as not found instead of revealing that they exist.
+    
+    Args:
+        db: Database session
+        model_id: Model UUID
+        user_id: ID of the requesting user
+    
+    Returns:
+        Model record
+    
+    Raises:
+        HTTPException: If no such model belongs to the user
+    """
+    model = db.query(Model).options(raiseload("*")).filter(
+        Model.id == model_id,
+        Model.user_id == user_id
+    ).first()
+    
+    if not model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model not found"
+        )
+    
+    return model
+
 
 @router.post("/upload", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def upload_model(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     name: str = Form(...),
     description: Optional[str] = Form(None),
@@ -53,35 +164,42 @@ async def upload_model(
             detail=f"Model type must be one of: {', '.join(settings.ALLOWED_MODEL_TYPES)}"
         )
     
-    # Check file size
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE_MB}MB"
-        )
+    # Get next version number for this model name. The Session and the
+    # filesystem block, so every step except the streaming read runs in the
+    # threadpool instead of on the event loop
+    version = await run_in_threadpool(_next_version, db, current_user.id, name)
     
-    # Get next version number for this model name
-    latest_model = db.query(Model).filter(
-        Model.user_id == current_user.id,
-        Model.name == name
-    ).order_by(desc(Model.version)).first()
-    
-    version = 1 if not latest_model else latest_model.version + 1
-    
-    # Create file path
+    # Stream into a temporary file; its final name depends on the content hash
     model_id = str(uuid_lib.uuid4())
-    file_dir = os.path.join(settings.UPLOAD_DIR, str(current_user.id), name, f"v{version}")
-    os.makedirs(file_dir, exist_ok=True)
+    incoming_dir = await run_in_threadpool(_ensure_dir, os.path.join(settings.UPLOAD_DIR, ".incoming"))
+    tmp_path = os.path.join(incoming_dir, f"{model_id}.part")
     
-    file_path = os.path.join(file_dir, file.filename or "model.pkl")
-    
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Read in chunks, hashing as we go and aborting as soon as the size
+    # limit is exceeded
+    max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    file_size = 0
+    hasher = hashlib.sha256()
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE_MB}MB"
+                    )
+                hasher.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        # Never leave a partial upload behind (size limit, client disconnect,
+        # disk full); the file may not exist yet if opening it failed. Removed
+        # inline: a cancelled request cannot await the threadpool here
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+    
+    content_hash = hasher.hexdigest()
+    file_path = await run_in_threadpool(_publish_upload, tmp_path, content_hash)
     
     # Create model record
     new_model = Model(
@@ -93,78 +211,129 @@ async def upload_model(
         version=version,
         file_path=file_path,
         file_size=file_size,
+        content_hash=content_hash,
         status="active"
     )
     
-    db.add(new_model)
-    db.commit()
-    db.refresh(new_model)
+    new_model = await run_in_threadpool(_save_model, db, new_model)
     
-    return {
-        "success": True,
-        "data": {
-            "model": ModelResponse.model_validate(new_model),
-            "prediction_endpoint": f"{settings.API_V1_PREFIX}/predict/{model_id}",
-            "message": "Model uploaded successfully"
-        }
-    }
+    # Compile to ONNX after responding; predictions use sklearn until it exists
+    if model_type == "sklearn":
+        background_tasks.add_task(compile_to_onnx, file_path)
+    
+    return ORJSONResponse(
+        {
+            "success": True,
+            "data": {
+                "model": _model_to_dict(new_model),
+                "prediction_endpoint": f"{settings.API_V1_PREFIX}/predict/{model_id}",
+                "message": "Model uploaded successfully"
+            }
+        },
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("", response_model=dict)
-async def list_models(
-    page: int = 1,
-    per_page: int = 20,
+def list_models(
+    page: int = Query(1, ge=1, le=10_000),
+    per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status_filter: Optional[str] = None,
+    include_total: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     List user's models
     
-    - **page**: Page number (default: 1)
+    - **page**: Page number (default: 1), ignored when cursor is given
     - **per_page**: Items per page (default: 20, max: 100)
+    - **cursor**: Opaque cursor from a previous response's next_cursor (keyset pagination)
     - **status**: Filter by status (active, deprecated, archived)
+    - **include_total**: Also return total_items/total_pages (runs an extra COUNT query)
     
     Requires authentication
     
-    Returns paginated list of models
+    Returns paginated list of models. Following next_cursor is cheaper than
+    page numbers: it never scans skipped rows.
     """
-    # Build query
-    query = db.query(Model).filter(Model.user_id == current_user.id)
+    # Select the listed columns as plain rows instead of hydrating Model instances
+    stmt = select(
+        Model.id,
+        Model.name,
+        Model.version,
+        Model.status,
+        Model.model_type,
+        Model.file_size,
+        Model.created_at
+    ).where(Model.user_id == current_user.id)
     
     if status_filter:
-        query = query.filter(Model.status == status_filter)
+        stmt = stmt.where(Model.status == status_filter)
+    
+    # Totals are opt-in: COUNT(*) scans every matching row. Counted before
+    # the cursor filter so every page reports the same total
+    total = None
+    if include_total:
+        total = db.execute(
+            select(func.count()).select_from(stmt.subquery())
+        ).scalar_one()
+    
+    if cursor:
+        # Keyset pagination: seek past the last row of the previous page
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Model.created_at, Model.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    
+    if not cursor:
+        stmt = stmt.offset((page - 1) * per_page)
     
-    # Get total count
-    total = query.count()
+    # Fetch one extra row to know whether another page exists
+    stmt = stmt.order_by(desc(Model.created_at), desc(Model.id)).limit(per_page + 1)
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
     
-    # Paginate
-    skip = (page - 1) * per_page
-    models = query.order_by(desc(Model.created_at)).offset(skip).limit(per_page).all()
+    # Prediction counts for the whole page in one grouped query
+    prediction_counts = {}
+    if rows:
+        prediction_counts = dict(db.execute(
+            select(Prediction.model_id, func.count(Prediction.id))
+            .where(Prediction.model_id.in_([row.id for row in rows]))
+            .group_by(Prediction.model_id)
+        ).all())
     
-    # TODO: Add prediction count from predictions table
     model_list = [
-        {
-            **ModelListResponse.model_validate(model).model_dump(),
-            "prediction_count": 0  # Placeholder
-        }
-        for model in models
+        {**row._mapping, "prediction_count": prediction_counts.get(row.id, 0)}
+        for row in rows
     ]
     
-    return {
-        "success": True,
-        "data": model_list,
-        "pagination": {
-            "page": page,
-            "per_page": per_page,
+    pagination = {
+        "per_page": per_page,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    }
+    if not cursor:
+        pagination["page"] = page
+    if total is not None:
+        pagination.update({
             "total_pages": (total + per_page - 1) // per_page,
             "total_items": total
-        }
-    }
+        })
+    
+    # Returned directly: the page is already plain data, so FastAPI's
+    # jsonable_encoder pass would only re-walk it
+    return ORJSONResponse({
+        "success": True,
+        "data": model_list,
+        "pagination": pagination
+    })
 
 
 @router.get("/{model_id}", response_model=dict)
-async def get_model(
+def get_model(
     model_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -178,36 +347,24 @@ async def get_model(
     
     Returns detailed model information
     """
-    model = db.query(Model).filter(Model.id == model_id).first()
-    
-    if not model:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Model not found"
-        )
-    
-    if model.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this model"
-        )
+    model = _get_owned_model(db, model_id, current_user.id)
     
     # TODO: Add statistics from predictions table
-    response_data = ModelResponse.model_validate(model).model_dump()
+    response_data = _model_to_dict(model)
     response_data["statistics"] = {
         "total_predictions": 0,
         "avg_inference_time_ms": 0,
         "success_rate": 100.0
     }
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "data": response_data
-    }
+    })
 
 
 @router.patch("/{model_id}", response_model=dict)
-async def update_model(
+def update_model(
     model_id: str,
     model_update: ModelUpdate,
     current_user: User = Depends(get_current_user),
@@ -222,19 +379,7 @@ async def update_model(
     
     Requires authentication and ownership
     """
-    model = db.query(Model).filter(Model.id == model_id).first()
-    
-    if not model:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Model not found"
-        )
-    
-    if model.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this model"
-        )
+    model = _get_owned_model(db, model_id, current_user.id)
     
     # Update fields
     if model_update.description is not None:
@@ -245,15 +390,15 @@ async def update_model(
     db.commit()
     db.refresh(model)
     
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": ModelResponse.model_validate(model),
+        "data": _model_to_dict(model),
         "message": "Model updated successfully"
-    }
+    })
 
 
 @router.delete("/{model_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_model(
+def delete_model(
     model_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -267,19 +412,7 @@ async def delete_model(
     
     Performs soft delete (sets status to 'archived')
     """
-    model = db.query(Model).filter(Model.id == model_id).first()
-    
-    if not model:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Model not found"
-        )
-    
-    if model.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this model"
-        )
+    model = _get_owned_model(db, model_id, current_user.id)
     
     # Soft delete
     model.status = "archived"
@@ -289,9 +422,9 @@ async def delete_model(
 
 
 @router.get("/{model_id}/analytics", response_model=dict)
-async def get_model_analytics(
+def get_model_analytics(
     model_id: str,
-    days: int = 7,
+    days: int = Query(7, ge=1, le=90),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -306,60 +439,36 @@ async def get_model_analytics(
     Returns prediction count, avg inference time, success rate, and usage trends
     """
     # Validate model exists and user has access
-    model = db.query(Model).filter(Model.id == model_id).first()
-    
-    if not model:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Model not found"
-        )
-    
-    if model.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this model's analytics"
-        )
-    
-    # Limit days to reasonable range
-    if days > 90:
-        days = 90
-    
-    # Query predictions for this model
-    predictions_query = db.query(Prediction).filter(Prediction.model_id == model_id)
-    
-    # Overall statistics
-    total_predictions = predictions_query.count()
-    successful_predictions = predictions_query.filter(Prediction.status == "success").count()
-    failed_predictions = predictions_query.filter(Prediction.status == "failed").count()
+    model = _get_owned_model(db, model_id, current_user.id)
+    
+    # Overall statistics in one pass (one scan instead of six queries)
+    succeeded = Prediction.status == "success"
+    timed = and_(succeeded, Prediction.inference_time_ms.isnot(None))
+    stats = db.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(succeeded).label("successful"),
+            func.count().filter(Prediction.status == "failed").label("failed"),
+            func.avg(Prediction.inference_time_ms).filter(timed).label("avg_time"),
+            func.min(Prediction.inference_time_ms).filter(timed).label("min_time"),
+            func.max(Prediction.inference_time_ms).filter(timed).label("max_time")
+        ).where(Prediction.model_id == model_id)
+    ).one()
+    total_predictions = stats.total
+    successful_predictions = stats.successful
+    failed_predictions = stats.failed
+    avg_inference_time = stats.avg_time
+    min_inference_time = stats.min_time
+    max_inference_time = stats.max_time
     
     # Calculate success rate
     success_rate = (successful_predictions / total_predictions * 100) if total_predictions > 0 else 0
     
-    # Average inference time (only for successful predictions)
-    avg_inference_time = db.query(func.avg(Prediction.inference_time_ms)).filter(
-        Prediction.model_id == model_id,
-        Prediction.status == "success",
-        Prediction.inference_time_ms.isnot(None)
-    ).scalar()
-    
-    # Min and max inference time
-    min_inference_time = db.query(func.min(Prediction.inference_time_ms)).filter(
-        Prediction.model_id == model_id,
-        Prediction.status == "success",
-        Prediction.inference_time_ms.isnot(None)
-    ).scalar()
-    
-    max_inference_time = db.query(func.max(Prediction.inference_time_ms)).filter(
-        Prediction.model_id == model_id,
-        Prediction.status == "success",
-        Prediction.inference_time_ms.isnot(None)
-    ).scalar()
-    
     # Daily usage trends (last N days)
-    from datetime import datetime, timedelta
+    from datetime import timedelta, timezone
     from sqlalchemy import cast, Date
     
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
     
     daily_stats = db.query(
         cast(Prediction.created_at, Date).label('date'),
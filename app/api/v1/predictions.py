@@ -2,11 +2,12 @@
 Prediction endpoints
 Handles real-time and batch predictions
 """
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import Any, List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy import desc, func, select, tuple_
 from datetime import datetime
-from uuid import UUID
 import time
 import numpy as np
 import logging
@@ -17,75 +18,70 @@ from app.models.model import Model
 from app.models.prediction import Prediction
 from app.schemas.prediction import (
     PredictionInput,
-    PredictionResponse,
-    PredictionResult,
-    PredictionMetadata
+    BatchPredictionInput
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, json_body, json_body_openapi
+from app.api.pagination import encode_cursor, decode_cursor
 from app.core.model_loader import get_model_loader, ModelLoader
+from app.core.config import settings
+from app.core.prediction_logger import prediction_logger
+from app.core.prediction_cache import get_prediction_cache, PredictionCache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/predict", tags=["Predictions"])
 
 
-# Background task to log predictions
-def log_prediction_to_db(
-    db: Session,
-    user_id: UUID,
-    model_id: UUID,
-    input_data: Dict[str, Any],
-    output_data: Dict[str, Any],
-    inference_time_ms: int,
-    status: str = "success",
-    error_message: str = None
-):
-    """Background task to log prediction to database"""
+def _feature_matrix(rows: List[Sequence[Any]]) -> np.ndarray:
+    """
+    Stack input rows into the 2-D array passed to the model
+    
+    Numeric rows become float32, matching the weights the loader casts.
+    Rows with strings or other non-numeric values (pipelines with encoders)
+    fall back to an object array, so each value reaches the model as sent.
+    
+    Args:
+        rows: Feature values per input row
+    
+    Returns:
+        Array of shape (len(rows), n_features)
+    
+    Raises:
+        ValueError: If the rows have different numbers of features
+    """
+    n_features = len(rows[0])
+    if any(len(row) != n_features for row in rows):
+        raise ValueError("All inputs must have the same number of features")
+    
     try:
-        prediction_log = Prediction(
-            user_id=user_id,
-            model_id=model_id,
-            input_data=input_data,
-            output_data=output_data,
-            inference_time_ms=inference_time_ms,
-            status=status,
-            error_message=error_message
-        )
-        db.add(prediction_log)
-        db.commit()
-        logger.info(f"Logged prediction for model {model_id}, status: {status}")
-    except Exception as e:
-        logger.error(f"Failed to log prediction: {str(e)}")
-        db.rollback()
+        return np.fromiter(
+            (value for row in rows for value in row),
+            dtype=np.float32,
+            count=len(rows) * n_features
+        ).reshape(len(rows), n_features)
+    except (ValueError, TypeError):
+        return np.array([list(row) for row in rows], dtype=object)
 
 
-@router.post("/{model_id}", response_model=dict)
-async def predict(
-    model_id: str,
-    prediction_input: PredictionInput,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    loader: ModelLoader = Depends(get_model_loader)
-):
+def _get_servable_model(db: Session, model_id: str, version: Optional[int]) -> Model:
     """
-    Make a real-time prediction
+    Look up a model that can serve predictions
     
-    - **model_id**: Model UUID
-    - **input**: Input data as JSON object
-    - **version**: Optional model version (defaults to latest)
+    Args:
+        db: Database session
+        model_id: Model UUID
+        version: Optional model version to require
     
-    Requires authentication
+    Returns:
+        Model record
     
-    Returns prediction result with metadata
+    Raises:
+        HTTPException: If the model is missing or not active/deprecated
     """
-    start_time = time.time()
-    
-    # Get model
     query = db.query(Model).filter(Model.id == model_id)
     
     # Filter by version if specified
-    if prediction_input.version:
-        query = query.filter(Model.version == prediction_input.version)
+    if version:
+        query = query.filter(Model.version == version)
     
     model_record = query.first()
     
@@ -101,8 +97,65 @@ async def predict(
             detail="Model is not available for predictions"
         )
     
+    return model_record
+
+
+@router.post("/{model_id}", response_model=dict, openapi_extra=json_body_openapi(PredictionInput))
+def predict(
+    model_id: str,
+    prediction_input: PredictionInput = Depends(json_body(PredictionInput)),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    loader: ModelLoader = Depends(get_model_loader),
+    prediction_cache: PredictionCache = Depends(get_prediction_cache)
+):
+    """
+    Make a real-time prediction
+    
+    - **model_id**: Model UUID
+    - **input**: Input data as JSON object
+    - **version**: Optional model version (defaults to latest)
+    
+    Requires authentication
+    
+    Returns prediction result with metadata. Results are cached per model
+    version and input, so repeated inputs skip inference.
+    """
+    start_time = time.time()
+    
+    # Get model
+    model_record = _get_servable_model(db, model_id, prediction_input.version)
+    
+    # Identical inputs to the same model version give identical results
+    cached_result = prediction_cache.get(model_record.id, model_record.version, prediction_input.input)
+    if cached_result is not None:
+        inference_time_ms = int((time.time() - start_time) * 1000)
+        prediction_logger.record(
+            user_id=current_user.id,
+            model_id=model_record.id,
+            input_data=prediction_input.input,
+            output_data=cached_result,
+            inference_time_ms=inference_time_ms
+        )
+        return ORJSONResponse({
+            "success": True,
+            "data": {
+                "prediction": cached_result,
+                "metadata": {
+                    "model_id": model_record.id,
+                    "model_version": model_record.version,
+                    "inference_time_ms": inference_time_ms,
+                    "cached": loader.is_model_cached(model_record.file_path),
+                    "result_cached": True
+                },
+                "timestamp": datetime.utcnow()
+            }
+        })
+    
     try:
-        # Load model from disk/cache
+        # Load model from disk/cache; identical uploads share one stored file
+        # and therefore one cache entry
+        model_cached = loader.is_model_cached(model_record.file_path)
         model = loader.load_model(model_record.file_path, str(model_record.id))
         
         # Prepare input data
@@ -119,7 +172,7 @@ async def predict(
             else:
                 raise ValueError("Input must be a dict or list")
             
-            X = np.array([feature_values])
+            X = _feature_matrix([feature_values])
             
             # Make prediction
             prediction = model.predict(X)
@@ -144,13 +197,13 @@ async def predict(
                 detail=f"Predictions for {model_record.model_type} models not yet implemented"
             )
         
+        prediction_cache.set(model_record.id, model_record.version, prediction_input.input, prediction_result)
+        
         # Calculate inference time
         inference_time_ms = int((time.time() - start_time) * 1000)
         
-        # Log prediction to database asynchronously (non-blocking)
-        background_tasks.add_task(
-            log_prediction_to_db,
-            db=db,
+        # Queue the log row; it is written with the next batched INSERT
+        prediction_logger.record(
             user_id=current_user.id,
             model_id=model_record.id,
             input_data=prediction_input.input,
@@ -159,30 +212,32 @@ async def predict(
             status="success"
         )
         
-        return {
+        # Returned directly so orjson serializes the payload without a
+        # jsonable_encoder pass over every probability
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "prediction": prediction_result,
                 "metadata": {
-                    "model_id": str(model_record.id),
+                    "model_id": model_record.id,
                     "model_version": model_record.version,
                     "inference_time_ms": inference_time_ms,
-                    "cached": loader.is_model_cached(str(model_record.id))
+                    "cached": model_cached,
+                    "result_cached": False,
+                    "backend": getattr(model, "backend", "sklearn")
                 },
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             }
-        }
-        
+        })
+    
     except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Model file not found on disk"
         )
     except Exception as e:
-        # Log failed prediction asynchronously
-        background_tasks.add_task(
-            log_prediction_to_db,
-            db=db,
+        # Queue the failed prediction log row
+        prediction_logger.record(
             user_id=current_user.id,
             model_id=model_record.id,
             input_data=prediction_input.input,
@@ -200,11 +255,137 @@ async def predict(
         )
 
 
+@router.post("/{model_id}/batch", response_model=dict, openapi_extra=json_body_openapi(BatchPredictionInput))
+def predict_batch(
+    model_id: str,
+    batch_input: BatchPredictionInput = Depends(json_body(BatchPredictionInput)),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    loader: ModelLoader = Depends(get_model_loader)
+):
+    """
+    Make predictions for many inputs in one call
+    
+    - **model_id**: Model UUID
+    - **inputs**: List of inputs, each a JSON object or a list of feature values
+    - **version**: Optional model version (defaults to latest)
+    
+    Requires authentication
+    
+    Runs the model once over all rows and logs them with a single INSERT.
+    Returns one prediction result per input, in order.
+    """
+    start_time = time.time()
+    
+    inputs = batch_input.inputs
+    if len(inputs) > settings.MAX_BATCH_PREDICTION_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Batch size exceeds maximum of {settings.MAX_BATCH_PREDICTION_SIZE} inputs"
+        )
+    
+    model_record = _get_servable_model(db, model_id, batch_input.version)
+    
+    if model_record.model_type != "sklearn":
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Predictions for {model_record.model_type} models not yet implemented"
+        )
+    
+    # Stack all rows into one matrix without building Python row lists
+    try:
+        X = _feature_matrix([row.values() if isinstance(row, dict) else row for row in inputs])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid batch input: {str(e)}"
+        )
+    
+    try:
+        # Load model from disk/cache; identical uploads share one cache entry
+        model_cached = loader.is_model_cached(model_record.file_path)
+        model = loader.load_model(model_record.file_path, str(model_record.id))
+        
+        # One vectorized call for the whole batch
+        predictions = model.predict(X).tolist()
+        if hasattr(model, 'predict_proba'):
+            proba = model.predict_proba(X)
+            probabilities = proba.tolist()
+            confidences = proba.max(axis=1).tolist()
+        else:
+            probabilities = [None] * len(predictions)
+            confidences = [None] * len(predictions)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model file not found on disk"
+        )
+    except Exception as e:
+        # Queue a failed log row per input, as single predictions do
+        per_row_time_ms = int((time.time() - start_time) * 1000) // len(inputs)
+        for input_data in inputs:
+            prediction_logger.record(
+                user_id=current_user.id,
+                model_id=model_record.id,
+                input_data=input_data,
+                output_data=None,
+                inference_time_ms=per_row_time_ms,
+                status="failed",
+                error_message=str(e)
+            )
+        
+        logger.error(f"Batch prediction failed for model {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction failed: {str(e)}"
+        )
+    
+    results = [
+        {
+            "prediction": prediction,
+            "confidence": confidence,
+            "probabilities": row_probabilities
+        }
+        for prediction, confidence, row_probabilities in zip(predictions, confidences, probabilities)
+    ]
+    
+    inference_time_ms = int((time.time() - start_time) * 1000)
+    
+    # Queue one log row per input; they are written with the next batched INSERT
+    per_row_time_ms = inference_time_ms // len(inputs)
+    for input_data, output_data in zip(inputs, results):
+        prediction_logger.record(
+            user_id=current_user.id,
+            model_id=model_record.id,
+            input_data=input_data,
+            output_data=output_data,
+            inference_time_ms=per_row_time_ms
+        )
+    
+    return ORJSONResponse({
+        "success": True,
+        "data": {
+            "predictions": results,
+            "metadata": {
+                "model_id": model_record.id,
+                "model_version": model_record.version,
+                "inference_time_ms": inference_time_ms,
+                "batch_size": len(inputs),
+                "cached": model_cached,
+                "backend": getattr(model, "backend", "sklearn")
+            },
+            "timestamp": datetime.utcnow()
+        }
+    })
+
+
 @router.get("/history", response_model=dict)
-async def get_prediction_history(
+def get_prediction_history(
     model_id: str = None,
-    page: int = 1,
-    per_page: int = 20,
+    page: int = Query(1, ge=1, le=10_000),
+    per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -212,23 +393,78 @@ async def get_prediction_history(
     Get prediction history
     
     - **model_id**: Optional model UUID to filter by
-    - **page**: Page number
-    - **per_page**: Items per page
+    - **page**: Page number, ignored when cursor is given
+    - **per_page**: Items per page (default: 20, max: 100)
+    - **cursor**: Opaque cursor from a previous response's next_cursor (keyset pagination)
+    - **include_total**: Also return total_items/total_pages (runs an extra COUNT query)
     
     Requires authentication
     
-    Returns paginated prediction history
+    Returns paginated prediction history, newest first
     """
-    # TODO: Implement prediction history query
-    # Query predictions table with filters
+    # Plain rows of the listed columns; no Prediction instances are hydrated
+    stmt = (
+        select(
+            Prediction.id,
+            Prediction.model_id,
+            Model.name.label("model_name"),
+            Prediction.input_data,
+            Prediction.output_data,
+            Prediction.inference_time_ms,
+            Prediction.status,
+            Prediction.created_at
+        )
+        .join(Model, Prediction.model_id == Model.id)
+        .where(Prediction.user_id == current_user.id)
+    )
     
-    return {
-        "success": True,
-        "data": [],
-        "pagination": {
-            "page": page,
-            "per_page": per_page,
-            "total_pages": 0,
-            "total_items": 0
-        }
+    if model_id:
+        stmt = stmt.where(Prediction.model_id == model_id)
+    
+    # Totals are opt-in: COUNT(*) scans every matching row. Counted before
+    # the cursor filter so every page reports the same total
+    total = None
+    if include_total:
+        total = db.execute(
+            select(func.count()).select_from(stmt.subquery())
+        ).scalar_one()
+    
+    if cursor:
+        # Keyset pagination: seek past the last row of the previous page
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Prediction.created_at, Prediction.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    
+    if not cursor:
+        stmt = stmt.offset((page - 1) * per_page)
+    
+    # Fetch one extra row to know whether another page exists
+    stmt = stmt.order_by(desc(Prediction.created_at), desc(Prediction.id)).limit(per_page + 1)
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    history = [dict(row._mapping) for row in rows]
+    
+    last = rows[-1] if rows else None
+    pagination = {
+        "per_page": per_page,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(last.created_at, last.id) if has_more else None
     }
+    if not cursor:
+        pagination["page"] = page
+    if total is not None:
+        pagination.update({
+            "total_pages": (total + per_page - 1) // per_page,
+            "total_items": total
+        })
+    
+    # Returned directly: jsonable_encoder would otherwise walk every
+    # logged input and output
+    return ORJSONResponse({
+        "success": True,
+        "data": history,
+        "pagination": pagination
+    })
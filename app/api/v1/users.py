@@ -3,12 +3,15 @@ User management endpoints
 Handles user profile operations
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
+from app.schemas.serialization import dump_row
 from app.api.dependencies import get_current_user
+from app.core.user_cache import user_cache
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -24,14 +27,14 @@ async def get_current_user_profile(
     
     Returns user profile information
     """
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": UserResponse.model_validate(current_user)
-    }
+        "data": dump_row(current_user, UserResponse)
+    })
 
 
 @router.patch("/me", response_model=dict)
-async def update_current_user(
+def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -44,6 +47,9 @@ async def update_current_user(
     
     Requires authentication
     """
+    # current_user may be a detached cached copy; modify the session's instance
+    current_user = db.get(User, current_user.id)
+    
     # Update fields
     if user_update.full_name is not None:
         current_user.full_name = user_update.full_name
@@ -65,9 +71,10 @@ async def update_current_user(
     
     db.commit()
     db.refresh(current_user)
+    user_cache.invalidate(current_user.id)
     
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": UserResponse.model_validate(current_user),
+        "data": dump_row(current_user, UserResponse),
         "message": "Profile updated successfully"
-    }
+    })
@@ -0,0 +1,95 @@
+"""
+API Key Lookup Cache
+Keeps recently authenticated API keys in memory to skip database lookups
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedAPIKey:
+    """Minimal API key data needed to authenticate a request"""
+    id: UUID
+    user_id: UUID
+    expires_at: Optional[float]  # Unix timestamp, compared against time.time()
+
+
+class APIKeyCache:
+    """
+    Thread-safe LRU cache with per-entry TTL, keyed by API key hash
+    
+    The cache is per process and a hit does not re-check is_active.
+    Updating or revoking a key only invalidates it in the worker that
+    served that request; other workers keep accepting it until their
+    entry expires, so ttl_seconds is the revocation window.
+    """
+    
+    def __init__(self, max_size: int = 10_000, ttl_seconds: int = 10):
+        """
+        Initialize API key cache
+        
+        Args:
+            max_size: Maximum number of keys to keep in memory
+            ttl_seconds: Seconds before a cached entry must be re-read from the database
+                (and the longest a key revoked elsewhere stays usable here)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._cache: OrderedDict[bytes, tuple[float, CachedAPIKey]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key_hash: bytes) -> Optional[CachedAPIKey]:
+        """Return cached entry for a key hash, or None if missing or stale"""
+        with self._lock:
+            item = self._cache.get(key_hash)
+            if item is None:
+                return None
+            
+            stored_at, entry = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._cache[key_hash]
+                return None
+            
+            self._cache.move_to_end(key_hash)
+            return entry
+    
+    def set(self, key_hash: bytes, entry: CachedAPIKey):
+        """Cache an entry, evicting the least recently used one when full"""
+        with self._lock:
+            self._cache[key_hash] = (time.monotonic(), entry)
+            self._cache.move_to_end(key_hash)
+            
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+    
+    def invalidate(self, key_hash: bytes):
+        """Drop a key hash from the cache (after update or revocation)"""
+        with self._lock:
+            if self._cache.pop(key_hash, None) is not None:
+                logger.debug("Invalidated cached API key")
+    
+    def clear(self):
+        """Clear all cached keys"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global API key cache instance
+api_key_cache = APIKeyCache(
+    max_size=settings.API_KEY_CACHE_SIZE,
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS
+)
+
+
+def get_api_key_cache() -> APIKeyCache:
+    """Get API key cache instance"""
+    return api_key_cache
@@ -0,0 +1,106 @@
+"""
+API Key Usage Tracking
+Buffers API key last_used_at timestamps in memory and writes them in batches
+"""
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+import logging
+
+from sqlalchemy import update, bindparam
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.api_key import APIKey
+
+logger = logging.getLogger(__name__)
+
+
+class APIKeyUsageTracker:
+    """Collects last_used_at updates and flushes them as one bulk UPDATE"""
+    
+    def __init__(self, flush_interval_seconds: float = 10):
+        """
+        Initialize usage tracker
+        
+        Args:
+            flush_interval_seconds: How often the background task writes pending updates
+        """
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def record(self, api_key_id: UUID, used_at: float):
+        """Record that an API key was used at a Unix timestamp (only the latest is kept)"""
+        with self._lock:
+            self._pending[api_key_id] = used_at
+    
+    def flush(self) -> int:
+        """
+        Write all pending timestamps to the database
+        
+        Returns:
+            Number of API keys updated
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        
+        if not pending:
+            return 0
+        
+        db = SessionLocal()
+        try:
+            # Core UPDATE so keys revoked in the meantime are simply skipped
+            db.execute(
+                update(APIKey.__table__)
+                .where(APIKey.__table__.c.id == bindparam("key_id"))
+                .values(last_used_at=bindparam("used_at")),
+                [
+                    {"key_id": key_id, "used_at": datetime.fromtimestamp(used_at, timezone.utc)}
+                    for key_id, used_at in pending.items()
+                ]
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush API key usage: {str(e)}")
+            # Put timestamps back unless a newer one arrived meanwhile
+            with self._lock:
+                for key_id, used_at in pending.items():
+                    self._pending.setdefault(key_id, used_at)
+            return 0
+        finally:
+            db.close()
+        
+        return len(pending)
+    
+    async def _run(self):
+        """Periodically flush pending updates"""
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await asyncio.to_thread(self.flush)
+    
+    def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background flush task and write any remaining updates"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+# Global usage tracker instance
+api_key_usage_tracker = APIKeyUsageTracker(
+    flush_interval_seconds=settings.API_KEY_USAGE_FLUSH_SECONDS
+)
@@ -3,15 +3,32 @@ Logging configuration
 Structured JSON logging for production
 """
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-import json
-from typing import Any, Dict
+import orjson
+from typing import Any, Dict, Optional, Tuple
 
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, ISO string) of the last formatted record; records from the
+        # same second reuse it instead of building a new datetime
+        self._ts_cache: Tuple[int, str] = (-1, "")
+    
+    def _timestamp(self, record: logging.LogRecord) -> str:
+        """UTC ISO timestamp of a record with millisecond precision"""
+        second = int(record.created)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = datetime.utcfromtimestamp(second).isoformat()
+            self._ts_cache = (second, prefix)
+        return f"{prefix}.{int(record.msecs):03d}"
+    
     def format(self, record: logging.LogRecord) -> str:
         """
         Format log record as JSON
@@ -23,7 +40,7 @@ class JSONFormatter(logging.Formatter):
             JSON formatted log string
         """
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._timestamp(record),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -43,37 +60,86 @@ class JSONFormatter(logging.Formatter):
             log_data["model_id"] = record.model_id
         if hasattr(record, "request_id"):
             log_data["request_id"] = record.request_id
-            
-        return json.dumps(log_data)
+        
+        # Structured events (extra={"event_data": {...}}) become top-level fields
+        event_data = getattr(record, "event_data", None)
+        if event_data:
+            log_data.update(event_data)
+        
+        # orjson encodes UUIDs and datetimes natively; anything else is stringified
+        return orjson.dumps(log_data, default=str).decode()
+
+
+class _ThreadQueueHandler(QueueHandler):
+    """QueueHandler for a listener thread in the same process"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message now (its arguments may change later), but keep
+        # exc_info so JSONFormatter still reports the exception separately
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Writes queued log records to stdout on a background thread
+_listener: Optional[QueueListener] = None
 
 
 def setup_logging(log_level: str = "INFO") -> None:
     """
     Configure application logging
     
+    Log calls only enqueue the record; formatting and writing to stdout
+    happen on a listener thread, so request handlers never wait on output.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    global _listener
+    
     # Create handler
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(JSONFormatter())
     
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
-    root_logger.addHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+    root_logger.handlers = [h for h in root_logger.handlers if not isinstance(h, _ThreadQueueHandler)]
+    root_logger.addHandler(_ThreadQueueHandler(log_queue))
+    
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
     
     # Disable uvicorn access logs in JSON format
     logging.getLogger("uvicorn.access").handlers = []
 
 
+def stop_logging() -> None:
+    """Write out queued log records and stop the listener thread"""
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        
+        # Anything logged afterwards is written directly
+        root_logger = logging.getLogger()
+        root_logger.handlers = [h for h in root_logger.handlers if not isinstance(h, _ThreadQueueHandler)]
+        for handler in _listener.handlers:
+            root_logger.addHandler(handler)
+        _listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance
     
     Args:
         name: Logger name (usually __name__)
-        
+    
     Returns:
         Configured logger instance
     """
@@ -1,163 +1,190 @@
 """
-Custom middleware for request logging, error tracking, and performance monitoring
+Custom middleware for request logging, error tracking, and slow request monitoring
+
+All middleware here is plain ASGI: BaseHTTPMiddleware runs every request
+through a task group and memory streams, which costs more than the logging itself.
 """
+import itertools
+import os
 import time
 import logging
-import json
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from typing import Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import traceback
 
-# Configure structured logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s'
-)
+# Handlers are configured by setup_logging
 logger = logging.getLogger(__name__)
 
 
-class RateLimitHeaderMiddleware(BaseHTTPMiddleware):
+# Request IDs are a per-process random prefix plus a counter: unique across
+# workers and concurrent requests, and cheap to generate
+_WORKER_ID = os.urandom(3).hex()
+_next_request_number = itertools.count().__next__
+
+
+def _log_event(level: int, event: dict):
+    """
+    Log a structured event
+    
+    The fields travel on the record and JSONFormatter merges them into the
+    log line, so the event is serialized once, on the logging thread.
+    """
+    logger.log(level, event["event"], extra={"event_data": event}, stacklevel=2)
+
+
+class RateLimitHeaderMiddleware:
     """
     Middleware to add rate limit headers to responses
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Add rate limit headers if metadata exists
-        if hasattr(request.state, "rate_limit_metadata"):
-            metadata = request.state.rate_limit_metadata
-            response.headers["X-RateLimit-Limit"] = str(metadata["limit"])
-            response.headers["X-RateLimit-Remaining"] = str(metadata["remaining"])
-            response.headers["X-RateLimit-Reset"] = str(metadata["reset"])
+        async def send_wrapper(message: Message):
+            # The rate limiter stores ready-encoded headers on request.state,
+            # which lives in scope["state"]
+            if message["type"] == "http.response.start":
+                rate_limit_headers = scope.get("state", {}).get("rate_limit_headers")
+                if rate_limit_headers:
+                    message["headers"] = [*message.get("headers", ()), *rate_limit_headers]
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_wrapper)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
     Middleware to log all incoming requests with timing information
+    
+    Also flags slow requests, so every request is timed exactly once.
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Start timer
-        start_time = time.time()
+    def __init__(self, app: ASGIApp, slow_threshold_ms: float = 1000, skip_paths: Tuple[str, ...] = ()):
+        """
+        Args:
+            app: Wrapped ASGI app
+            slow_threshold_ms: Duration above which a request is logged as slow
+            skip_paths: Path prefixes passed through untimed and unlogged
+                (health probes and API docs, polled far more than they are read)
+        """
+        self.app = app
+        self.slow_threshold_ms = slow_threshold_ms
+        self.skip_paths = tuple(skip_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+            return
         
-        # Get request details
-        request_id = str(time.time())
-        method = request.method
-        path = request.url.path
-        client_host = request.client.host if request.client else "unknown"
+        # Start timer (monotonic; wall-clock time is only used for log timestamps)
+        start = time.perf_counter()
         
-        # Log request
-        logger.info(json.dumps({
-            "event": "request_started",
-            "request_id": request_id,
-            "method": method,
-            "path": path,
-            "client": client_host,
-            "timestamp": time.time()
-        }))
+        # Get request details
+        request_id = f"{_WORKER_ID}-{_next_request_number():x}"
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
         
-        # Process request
-        try:
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration_ms = (time.time() - start_time) * 1000
-            
-            # Log response
-            logger.info(json.dumps({
-                "event": "request_completed",
+        # Log request (only build the event if INFO is enabled)
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            _log_event(logging.INFO, {
+                "event": "request_started",
                 "request_id": request_id,
                 "method": method,
                 "path": path,
-                "status_code": response.status_code,
-                "duration_ms": round(duration_ms, 2),
-                "timestamp": time.time()
-            }))
-            
-            # Add custom headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Response-Time"] = f"{round(duration_ms, 2)}ms"
-            
-            return response
-            
+                "client": client_host
+            })
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                # Calculate duration
+                duration_ms = round((time.perf_counter() - start) * 1000, 2)
+                
+                # Log slow requests
+                if duration_ms > self.slow_threshold_ms:
+                    _log_event(logging.WARNING, {
+                        "event": "slow_request",
+                        "request_id": request_id,
+                        "path": path,
+                        "method": method,
+                        "duration_ms": duration_ms,
+                        "threshold_ms": self.slow_threshold_ms
+                    })
+                
+                # Log response
+                if log_info:
+                    _log_event(logging.INFO, {
+                        "event": "request_completed",
+                        "request_id": request_id,
+                        "method": method,
+                        "path": path,
+                        "status_code": message["status"],
+                        "duration_ms": duration_ms
+                    })
+                
+                # Add custom headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Response-Time"] = f"{duration_ms}ms"
+            await send(message)
+        
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Calculate duration even for errors
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start) * 1000
             
             # Log error
-            logger.error(json.dumps({
+            _log_event(logging.ERROR, {
                 "event": "request_failed",
                 "request_id": request_id,
                 "method": method,
                 "path": path,
                 "error": str(e),
-                "duration_ms": round(duration_ms, 2),
-                "timestamp": time.time()
-            }))
+                "duration_ms": round(duration_ms, 2)
+            })
             
             # Re-raise the exception
             raise
 
 
-class ErrorTrackingMiddleware(BaseHTTPMiddleware):
+class ErrorTrackingMiddleware:
     """
     Middleware to catch and log all unhandled exceptions
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         try:
-            response = await call_next(request)
-            return response
-            
+            await self.app(scope, receive, send)
         except Exception as e:
             # Get full traceback
             tb = traceback.format_exc()
             
             # Log detailed error
-            logger.error(json.dumps({
+            _log_event(logging.ERROR, {
                 "event": "unhandled_exception",
                 "error_type": type(e).__name__,
                 "error_message": str(e),
-                "path": request.url.path,
-                "method": request.method,
-                "traceback": tb,
-                "timestamp": time.time()
-            }))
+                "path": scope["path"],
+                "method": scope["method"],
+                "traceback": tb
+            })
             
             # Re-raise to let FastAPI handle it
             raise
-
-
-class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to track endpoint performance and log slow requests
-    """
-    
-    def __init__(self, app: ASGIApp, slow_threshold_ms: float = 1000):
-        super().__init__(app)
-        self.slow_threshold_ms = slow_threshold_ms
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
-        
-        response = await call_next(request)
-        
-        duration_ms = (time.time() - start_time) * 1000
-        
-        # Log slow requests
-        if duration_ms > self.slow_threshold_ms:
-            logger.warning(json.dumps({
-                "event": "slow_request",
-                "path": request.url.path,
-                "method": request.method,
-                "duration_ms": round(duration_ms, 2),
-                "threshold_ms": self.slow_threshold_ms,
-                "timestamp": time.time()
-            }))
-        
-        return response
@@ -0,0 +1,133 @@
+"""
+Model Compilation
+Converts uploaded sklearn models to ONNX so predictions skip sklearn's Python dispatch
+"""
+import os
+from typing import Any, Optional
+import logging
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ONNX support is optional: without these packages models are served by sklearn
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    convert_sklearn = None
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+ONNX_SUFFIX = ".onnx"
+
+
+def onnx_path_for(file_path: str) -> str:
+    """Path of the compiled ONNX model stored next to a pickled model"""
+    return file_path + ONNX_SUFFIX
+
+
+def compile_to_onnx(file_path: str) -> bool:
+    """
+    Compile a pickled sklearn model to ONNX next to the original file
+    
+    Meant to run once per stored file (after upload, in the background).
+    Models skl2onnx cannot convert simply keep being served by sklearn.
+    
+    Args:
+        file_path: Path to the pickled model
+    
+    Returns:
+        True if an ONNX model exists for the file afterwards
+    """
+    if convert_sklearn is None:
+        return False
+    
+    target = onnx_path_for(file_path)
+    if os.path.exists(target):
+        return True
+    
+    try:
+        model = joblib.load(file_path)
+        n_features = getattr(model, "n_features_in_", None)
+        if n_features is None:
+            return False
+        
+        onnx_model = convert_sklearn(
+            model,
+            initial_types=[("X", FloatTensorType([None, n_features]))],
+            # Plain probability matrix instead of a list of {class: prob} maps
+            options={id(model): {"zipmap": False}} if hasattr(model, "predict_proba") else None
+        )
+        
+        tmp_path = f"{target}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(onnx_model.SerializeToString())
+        os.replace(tmp_path, target)
+        
+        logger.info(f"Compiled model to ONNX: {target}")
+        return True
+    except Exception as e:
+        logger.info(f"ONNX compilation skipped for {file_path}: {str(e)}")
+        return False
+
+
+class OnnxModel:
+    """ONNX Runtime session exposing the sklearn predict/predict_proba interface"""
+    
+    backend = "onnx"
+    
+    def __init__(self, path: str):
+        """
+        Load a compiled model
+        
+        Args:
+            path: Path to the .onnx file
+        """
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+        
+        # Classifiers have a second (probabilities) output; only they get
+        # predict_proba, so hasattr() checks behave like sklearn's
+        if len(self.session.get_outputs()) > 1:
+            self.predict_proba = self._predict_proba
+    
+    def _run(self, X: Any) -> list:
+        return self.session.run(None, {self._input_name: np.asarray(X, dtype=np.float32)})
+    
+    def predict(self, X: Any) -> np.ndarray:
+        """Predict labels (classifiers) or values (regressors)"""
+        output = self._run(X)[0]
+        # Regressors return a (n, 1) column
+        return output.ravel() if output.ndim == 2 and output.shape[1] == 1 else output
+    
+    def _predict_proba(self, X: Any) -> np.ndarray:
+        return self._run(X)[1]
+
+
+def load_onnx_model(file_path: str) -> Optional[OnnxModel]:
+    """
+    Load the compiled ONNX variant of a pickled model, if there is one
+    
+    Args:
+        file_path: Path to the pickled model
+    
+    Returns:
+        OnnxModel, or None if ONNX Runtime or the compiled file is unavailable
+    """
+    if onnxruntime is None:
+        return None
+    
+    path = onnx_path_for(file_path)
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        return OnnxModel(path)
+    except Exception as e:
+        logger.warning(f"Failed to load ONNX model {path}, using sklearn: {str(e)}")
+        return None
@@ -2,107 +2,284 @@
 Model Loading and Caching Service
 Handles loading ML models from disk and caching them in memory
 """
+import os
 import joblib
+import numpy as np
 import pickle
+import threading
+from collections import OrderedDict, namedtuple
 from typing import Any, Optional
-from functools import lru_cache
 import logging
-from pathlib import Path
+
+from app.core.config import settings
+from app.core.model_compiler import load_onnx_model, onnx_path_for
 
 logger = logging.getLogger(__name__)
 
+# Read buffer for the plain pickle fallback (fewer read syscalls on large files)
+PICKLE_READ_BUFFER = 1 << 20
+
+# Memory-pressure eviction is optional: without psutil only the count limit applies
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Same fields as functools.lru_cache's cache_info()
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
 
 class ModelLoader:
     """Service for loading and caching ML models"""
     
-    def __init__(self, cache_size: int = 5):
+    def __init__(
+        self,
+        cache_size: int = 5,
+        cast_float32: bool = True,
+        prefer_onnx: bool = True,
+        memory_free_threshold_mb: int = 0,
+        mmap: bool = True
+    ):
         """
         Initialize model loader
         
         Args:
             cache_size: Maximum number of models to keep in memory
+            cast_float32: Cast linear model weights to float32 after loading
+            prefer_onnx: Serve the compiled ONNX variant of a model when one exists
+            memory_free_threshold_mb: Free memory to keep available when loading
+                a new model; cached models are released to make room. 0 disables
+            mmap: Map arrays stored by joblib.dump read-only from the page cache
+                instead of copying them into memory
         """
         self.cache_size = cache_size
-        self._cache: dict[str, Any] = {}
+        self.cast_float32 = cast_float32
+        self.prefer_onnx = prefer_onnx
+        self.memory_free_threshold_mb = memory_free_threshold_mb
+        self.mmap = mmap
+        
+        # Loaded models keyed by (path, mtime_ns, onnx_mtime_ns), least
+        # recently used first. Keys include the modification times, so a
+        # replaced file is loaded again instead of being served stale, and a
+        # model switches to ONNX Runtime once its compiled variant is written. An OrderedDict rather than lru_cache
+        # so memory pressure can evict single entries. _lock guards it and the
+        # counters and is only held for dict operations, never during a load.
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        
+        # One lock per (path, mtime_ns) being loaded, so concurrent requests
+        # for a cold or modified model wait for a single load instead of each
+        # reading the file
+        self._load_locks: dict[tuple, threading.Lock] = {}
     
     def load_model(self, file_path: str, model_id: str) -> Any:
         """
         Load a model from disk (with LRU caching)
         
+        Blocks while a cold model is read and unpickled, so call it from
+        synchronous (threadpool) code, never directly from a coroutine.
+        
         Args:
             file_path: Path to model file
-            model_id: Unique model identifier for caching
-            
+            model_id: Model identifier, used for logging
+        
         Returns:
             Loaded model object
-            
+        
         Raises:
             FileNotFoundError: If model file doesn't exist
             Exception: If model loading fails
         """
-        # Check if model is in cache
-        if model_id in self._cache:
-            logger.info(f"Model {model_id} loaded from cache")
-            return self._cache[model_id]
+        try:
+            key, file_size = self._cache_key(file_path)
+        except FileNotFoundError:
+            logger.error(f"Failed to load model {model_id}: file not found: {file_path}")
+            raise FileNotFoundError(f"Model file not found: {file_path}")
+        
+        # Every miss, including a replaced, touched or newly compiled file,
+        # goes through the single-flight load
+        hit, model = self._get_cached(key)
+        if hit:
+            return model
         
-        # Load from disk
         try:
-            model_path = Path(file_path)
-            
-            if not model_path.exists():
-                raise FileNotFoundError(f"Model file not found: {file_path}")
-            
+            return self._load_once(key, file_size)
+        except Exception as e:
+            logger.error(f"Failed to load model {model_id}: {str(e)}")
+            raise
+    
+    def _cache_key(self, file_path: str) -> tuple[tuple, int]:
+        """
+        Cache key and size of a model file
+        
+        Raises:
+            FileNotFoundError: If model file doesn't exist
+        """
+        stat = os.stat(file_path)
+        onnx_mtime_ns = None
+        if self.prefer_onnx:
+            try:
+                onnx_mtime_ns = os.stat(onnx_path_for(file_path)).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return (file_path, stat.st_mtime_ns, onnx_mtime_ns), stat.st_size
+    
+    def _get_cached(self, key: tuple) -> tuple[bool, Any]:
+        """Look up a cached model, refreshing its recency on a hit"""
+        with self._lock:
+            if key not in self._cache:
+                return False, None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return True, self._cache[key]
+    
+    def _load_once(self, key: tuple, file_size: int) -> Any:
+        """Load a model version while holding its lock; waiters get a cache hit"""
+        with self._lock:
+            lock = self._load_locks.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                hit, model = self._get_cached(key)
+                if hit:
+                    return model
+                
+                if self.memory_free_threshold_mb:
+                    self._release_memory_for(file_size)
+                model = self._load_from_disk(key[0])
+                self._store(key, model)
+                return model
+            finally:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+    
+    def _store(self, key: tuple, model: Any):
+        """Cache a freshly loaded model, dropping older versions of its file and the least recently used beyond cache_size"""
+        with self._lock:
+            self._misses += 1
+            for stale in [k for k in self._cache if k[0] == key[0]]:
+                del self._cache[stale]
+            if self.cache_size <= 0:
+                return
+            self._cache[key] = model
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _load_from_disk(self, file_path: str) -> Any:
+        """Load a model file; only runs on cache misses"""
+        # Prefer the compiled ONNX model; the pickle stays the fallback
+        model = load_onnx_model(file_path) if self.prefer_onnx else None
+        if model is not None:
+            logger.info(f"Model loaded with ONNX Runtime: {file_path}")
+        else:
             # Try loading with joblib first, then pickle as fallback
             try:
-                model = joblib.load(file_path)
+                model = joblib.load(file_path, mmap_mode="r" if self.mmap and self._is_uncompressed(file_path) else None)
                 logger.info(f"Model loaded with joblib: {file_path}")
             except Exception as joblib_error:
                 logger.warning(f"Joblib load failed, trying pickle: {str(joblib_error)}")
                 try:
-                    with open(file_path, 'rb') as f:
+                    with open(file_path, 'rb', buffering=PICKLE_READ_BUFFER) as f:
                         model = pickle.load(f)
                     logger.info(f"Model loaded with pickle: {file_path}")
                 except Exception as pickle_error:
                     raise Exception(f"Failed to load model with both joblib and pickle. Joblib: {str(joblib_error)}, Pickle: {str(pickle_error)}")
             
-            # Add to cache
-            self._add_to_cache(model_id, model)
-            
-            logger.info(f"Model {model_id} successfully loaded and cached")
-            return model
-            
-        except Exception as e:
-            logger.error(f"Failed to load model {model_id}: {str(e)}")
-            raise
+            if self.cast_float32:
+                self._cast_to_float32(model)
+        
+        return model
     
-    def _add_to_cache(self, model_id: str, model: Any):
-        """Add model to cache with LRU eviction"""
-        # If cache is full, remove oldest entry
-        if len(self._cache) >= self.cache_size:
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
-            logger.info(f"Evicted model {oldest_key} from cache")
-        
-        self._cache[model_id] = model
+    def _release_memory_for(self, file_size: int):
+        """
+        Drop cached models if loading another would eat into the free memory threshold
+        
+        Model sizes vary by orders of magnitude, so a count limit alone cannot
+        prevent running out of memory. The file size is used as a lower bound
+        for the memory the new model will take. Models are released least
+        recently used first, one at a time, until enough memory is free.
+        """
+        if psutil is None:
+            return
+        
+        needed = self.memory_free_threshold_mb * 1024 * 1024 + file_size
+        while True:
+            available = psutil.virtual_memory().available
+            if available >= needed:
+                return
+            with self._lock:
+                if not self._cache:
+                    return
+                key, _ = self._cache.popitem(last=False)
+            logger.warning(
+                f"Low memory ({available // (1024 * 1024)}MB available), "
+                f"released cached model {key[0]}"
+            )
+    
+    @staticmethod
+    def _is_uncompressed(file_path: str) -> bool:
+        """
+        Whether a model file is a plain pickle, the only kind joblib can memory-map
+        
+        Pickles (protocol 2+) start with the PROTO opcode; joblib's compressed
+        formats start with their compressor's magic bytes instead.
+        """
+        with open(file_path, 'rb') as f:
+            return f.read(1) == pickle.PROTO
+    
+    def _cast_to_float32(self, model: Any):
+        """
+        Cast linear model weights to float32 so float32 inputs stay float32
+        
+        Predictions are fed float32 features. Without this, sklearn's linear
+        models upcast every batch to float64 to match coef_; with it the dot
+        product runs in float32 and moves half the bytes. Coefficients keep
+        ~7 significant digits, so probabilities can differ from the float64
+        model around the 1e-7 level and class labels only flip for inputs
+        sitting exactly on the decision boundary.
+        
+        Tree ensembles need no change: sklearn already evaluates trees on
+        float32 features. Pipelines are handled step by step.
+        """
+        for step in getattr(model, "steps", None) or [(None, model)]:
+            estimator = step[1]
+            coef = getattr(estimator, "coef_", None)
+            if isinstance(coef, np.ndarray) and coef.dtype == np.float64:
+                estimator.coef_ = coef.astype(np.float32)
+                intercept = getattr(estimator, "intercept_", None)
+                if isinstance(intercept, np.ndarray):
+                    estimator.intercept_ = intercept.astype(np.float32)
     
     def clear_cache(self):
         """Clear all models from cache"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         logger.info("Model cache cleared")
     
-    def remove_from_cache(self, model_id: str):
-        """Remove a specific model from cache"""
-        if model_id in self._cache:
-            del self._cache[model_id]
-            logger.info(f"Model {model_id} removed from cache")
+    def is_model_cached(self, file_path: str) -> bool:
+        """
+        Check if the current version of a model file is in memory
+        
+        Does not count as a use, so the model's LRU position is unchanged.
+        """
+        try:
+            key, _ = self._cache_key(file_path)
+        except FileNotFoundError:
+            return False
+        return key in self._cache
     
-    def is_model_cached(self, model_id: str) -> bool:
-        """Check if a model is currently in cache"""
-        return model_id in self._cache
+    def cache_info(self):
+        """Hit, miss and size statistics of the model cache"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.cache_size, len(self._cache))
 
 
 # Global model loader instance
-model_loader = ModelLoader(cache_size=5)
+model_loader = ModelLoader(
+    cache_size=settings.MODEL_CACHE_SIZE,
+    memory_free_threshold_mb=settings.MODEL_MEMORY_FREE_THRESHOLD_MB
+)
 
 
 def get_model_loader() -> ModelLoader:
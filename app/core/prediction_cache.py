@@ -0,0 +1,96 @@
+"""
+Prediction Result Cache
+Stores results of deterministic models in Redis keyed by model and input
+"""
+import hashlib
+import time
+import orjson
+import redis
+from typing import Any, Dict, Optional
+from uuid import UUID
+import logging
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stop talking to Redis after an error, so an outage costs one
+# failed round trip per interval instead of one per request
+REDIS_RETRY_SECONDS = 30
+
+
+class PredictionCache:
+    """
+    Redis-backed cache of prediction results
+    
+    Keys are pred:<model_id>:<version>:<blake2b(input)>. The input is
+    serialized in the order it was sent: feature values are taken from a
+    dict in that order, so reordered keys are a different model input.
+    All errors fail open to running the model.
+    """
+    
+    def __init__(self, redis_client: Optional[redis.Redis], ttl_seconds: int = 3600):
+        """
+        Initialize prediction cache
+        
+        Args:
+            redis_client: Redis client, or None to disable caching
+            ttl_seconds: Seconds a cached result is kept
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self._disabled_until = 0.0
+    
+    @staticmethod
+    def _key(model_id: UUID, version: int, input_data: Any) -> Optional[str]:
+        """Cache key for an input, or None if orjson can't serialize it (ints over 64 bits)"""
+        try:
+            serialized = orjson.dumps(input_data)
+        except TypeError:
+            return None
+        
+        # Non-cryptographic key, so the faster BLAKE2 is enough
+        digest = hashlib.blake2b(serialized, digest_size=16).hexdigest()
+        return f"pred:{model_id}:{version}:{digest}"
+    
+    def _available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._disabled_until
+    
+    def _on_error(self, e: Exception):
+        logger.warning(f"Prediction cache unavailable: {str(e)}")
+        self._disabled_until = time.monotonic() + REDIS_RETRY_SECONDS
+    
+    def get(self, model_id: UUID, version: int, input_data: Any) -> Optional[Dict[str, Any]]:
+        """Return a cached prediction result, or None on a miss or Redis error"""
+        key = self._key(model_id, version, input_data)
+        if key is None or not self._available():
+            return None
+        
+        try:
+            cached = self.redis.get(key)
+        except redis.RedisError as e:
+            self._on_error(e)
+            return None
+        
+        return orjson.loads(cached) if cached is not None else None
+    
+    def set(self, model_id: UUID, version: int, input_data: Any, result: Dict[str, Any]):
+        """Cache a prediction result for an input"""
+        key = self._key(model_id, version, input_data)
+        if key is None or not self._available():
+            return
+        
+        try:
+            self.redis.set(key, orjson.dumps(result), ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            self._on_error(e)
+
+
+# Global prediction cache instance
+prediction_cache = PredictionCache(redis_client, ttl_seconds=settings.CACHE_TTL_SECONDS)
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Get prediction cache instance"""
+    return prediction_cache
@@ -0,0 +1,154 @@
+"""
+Prediction Logging
+Buffers prediction log rows in memory and writes them with multi-row INSERTs
+"""
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.prediction import Prediction
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionLogger:
+    """Collects prediction log rows and flushes them in batches"""
+    
+    def __init__(
+        self,
+        flush_interval_seconds: float = 0.2,
+        batch_size: int = 100,
+        max_pending: int = 10_000
+    ):
+        """
+        Initialize prediction logger
+        
+        Args:
+            flush_interval_seconds: Longest time a row waits before being written
+            batch_size: Pending rows that trigger an early flush
+            max_pending: Rows kept while the database is unavailable; older rows are dropped
+        """
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def record(
+        self,
+        user_id: UUID,
+        model_id: UUID,
+        input_data: Any,
+        output_data: Optional[Dict[str, Any]],
+        inference_time_ms: int,
+        status: str = "success",
+        error_message: Optional[str] = None
+    ):
+        """Queue one prediction log row (safe to call from any thread)"""
+        row = {
+            "user_id": user_id,
+            "model_id": model_id,
+            "input_data": input_data,
+            "output_data": output_data,
+            "inference_time_ms": inference_time_ms,
+            "status": status,
+            "error_message": error_message
+        }
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+    
+    def flush(self) -> int:
+        """
+        Write all pending rows to the database
+        
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        
+        if not pending:
+            return 0
+        
+        db = SessionLocal()
+        try:
+            db.execute(insert(Prediction.__table__), pending)
+            db.commit()
+        except IntegrityError:
+            # A model or user was deleted meanwhile; keep the rows that still fit
+            db.rollback()
+            return self._insert_individually(db, pending)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush {len(pending)} prediction logs: {str(e)}")
+            # Requeue ahead of newer rows, dropping the oldest beyond max_pending
+            with self._lock:
+                self._pending = (pending + self._pending)[-self.max_pending:]
+            return 0
+        finally:
+            db.close()
+        
+        return len(pending)
+    
+    def _insert_individually(self, db, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows one at a time, dropping those that violate constraints"""
+        written = 0
+        for row in rows:
+            try:
+                db.execute(insert(Prediction.__table__), [row])
+                db.commit()
+                written += 1
+            except IntegrityError:
+                db.rollback()
+                logger.warning(f"Dropped prediction log for deleted model or user (model {row['model_id']})")
+        return written
+    
+    async def _run(self):
+        """Flush every interval, or sooner once a batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
+    
+    def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background flush task and write any remaining rows"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        await asyncio.to_thread(self.flush)
+
+
+# Global prediction logger instance
+prediction_logger = PredictionLogger(
+    flush_interval_seconds=settings.PREDICTION_LOG_FLUSH_SECONDS,
+    batch_size=settings.PREDICTION_LOG_BATCH_SIZE
+)
@@ -1,31 +1,72 @@
 """
 Rate limiting using Redis
-Implements token bucket algorithm for API rate limiting
+Fixed-window counters by default, with an exact sliding window as an option
 """
+import os
 import time
-import redis
+from dataclasses import dataclass
+import redis.asyncio as aioredis
 from typing import Optional
 from fastapi import HTTPException, status, Request
 from app.core.config import settings
+from app.core.redis_client import async_redis_client
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Sliding-window check in one atomic round trip. Running the steps
+# server-side also closes the race between counting and adding, which
+# let concurrent requests exceed the limit.
+# KEYS[1] = window key; ARGV = now, window_start, max_requests, window_seconds, member
+# Returns {1, count_before} if allowed, {0, count, oldest_score} otherwise
+SLIDING_WINDOW_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[2])
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[5])
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+    return {1, count}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, count, oldest[2]}
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # Unix timestamp when the window frees up
+
+
 class RateLimiter:
     """
-    Redis-based rate limiter using token bucket algorithm
+    Redis-based rate limiter
     """
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: Optional[aioredis.Redis], sliding_window: bool = False):
+        """
+        Initialize rate limiter
+        
+        Args:
+            redis_client: Async Redis client, or None to allow every request
+            sliding_window: Track every request in a sorted set for an exact
+                sliding window instead of one counter per fixed window
+        """
         self.redis = redis_client
+        self.sliding_window = sliding_window
+        # Script objects run via EVALSHA and reload the script on NOSCRIPT
+        self._sliding_window = redis_client.register_script(SLIDING_WINDOW_SCRIPT) if redis_client is not None else None
     
     async def check_rate_limit(
         self,
         key: str,
         max_requests: int,
         window_seconds: int
-    ) -> tuple[bool, dict]:
+    ) -> RateLimitResult:
         """
         Check if request is within rate limit
         
@@ -35,50 +76,83 @@ class RateLimiter:
             window_seconds: Time window in seconds
             
         Returns:
-            Tuple of (allowed: bool, metadata: dict)
+            RateLimitResult with the decision and header values
         """
         try:
-            current_time = time.time()
-            window_start = current_time - window_seconds
-            
-            # Redis key for this rate limit
-            redis_key = f"rate_limit:{key}"
-            
-            # Remove old entries outside the window
-            self.redis.zremrangebyscore(redis_key, 0, window_start)
-            
-            # Count requests in current window
-            request_count = self.redis.zcard(redis_key)
-            
-            if request_count < max_requests:
-                # Add current request
-                self.redis.zadd(redis_key, {str(current_time): current_time})
-                self.redis.expire(redis_key, window_seconds)
-                
-                return True, {
-                    "limit": max_requests,
-                    "remaining": max_requests - request_count - 1,
-                    "reset": int(current_time + window_seconds)
-                }
-            else:
-                # Get oldest request time to calculate reset
-                oldest = self.redis.zrange(redis_key, 0, 0, withscores=True)
-                reset_time = int(oldest[0][1] + window_seconds) if oldest else int(current_time + window_seconds)
-                
-                return False, {
-                    "limit": max_requests,
-                    "remaining": 0,
-                    "reset": reset_time
-                }
+            if self.sliding_window:
+                return await self._check_sliding_window(key, max_requests, window_seconds)
+            return await self._check_fixed_window(key, max_requests, window_seconds)
         
         except Exception as e:
             logger.error(f"Rate limiter error: {str(e)}")
             # Fail open - allow request if Redis is down
-            return True, {
-                "limit": max_requests,
-                "remaining": max_requests,
-                "reset": int(time.time() + window_seconds)
-            }
+            return RateLimitResult(
+                allowed=True,
+                limit=max_requests,
+                remaining=max_requests,
+                reset=int(time.time() + window_seconds)
+            )
+    
+    async def _check_fixed_window(self, key: str, max_requests: int, window_seconds: int) -> RateLimitResult:
+        """
+        Count requests in the current fixed window with INCR
+        
+        One small counter per key and window instead of a sorted set entry per
+        request. Keys are aligned to the window, so the reset time is known
+        without asking Redis for the TTL.
+        """
+        window = int(time.time()) // window_seconds
+        reset_time = (window + 1) * window_seconds
+        redis_key = f"rate_limit:{key}:{window}"
+        
+        # INCR and EXPIREAT in one round trip; EXPIREAT is idempotent
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.incr(redis_key)
+        pipe.expireat(redis_key, reset_time + 1)
+        request_count, _ = await pipe.execute()
+        
+        return RateLimitResult(
+            allowed=request_count <= max_requests,
+            limit=max_requests,
+            remaining=max(max_requests - request_count, 0),
+            reset=reset_time
+        )
+    
+    async def _check_sliding_window(self, key: str, max_requests: int, window_seconds: int) -> RateLimitResult:
+        """Track each request in a sorted set for an exact sliding window"""
+        current_time = time.time()
+        window_start = current_time - window_seconds
+        
+        # Redis key for this rate limit
+        redis_key = f"rate_limit:{key}"
+        
+        # Unique member so concurrent requests at the same instant all count
+        member = f"{current_time}:{os.urandom(4).hex()}"
+        
+        result = await self._sliding_window(
+            keys=[redis_key],
+            args=[current_time, window_start, max_requests, window_seconds, member]
+        )
+        
+        if result[0] == 1:
+            request_count = int(result[1])
+            return RateLimitResult(
+                allowed=True,
+                limit=max_requests,
+                remaining=max_requests - request_count - 1,
+                reset=int(current_time + window_seconds)
+            )
+        else:
+            # Oldest request in the window determines the reset time
+            oldest_score = result[2] if len(result) > 2 else None
+            reset_time = int(float(oldest_score) + window_seconds) if oldest_score is not None else int(current_time + window_seconds)
+            
+            return RateLimitResult(
+                allowed=False,
+                limit=max_requests,
+                remaining=0,
+                reset=reset_time
+            )
 
 
 # Global rate limiter instance
@@ -90,19 +164,9 @@ def get_rate_limiter() -> RateLimiter:
     global _rate_limiter
     
     if _rate_limiter is None:
-        try:
-            redis_client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=0,
-                decode_responses=False
-            )
-            _rate_limiter = RateLimiter(redis_client)
-            logger.info("Rate limiter initialized with Redis")
-        except Exception as e:
-            logger.warning(f"Failed to initialize rate limiter: {str(e)}")
-            # Create a dummy limiter that always allows
-            _rate_limiter = RateLimiter(None)
+        # Shared async pool: check_rate_limit runs on the event loop
+        _rate_limiter = RateLimiter(async_redis_client, sliding_window=settings.RATE_LIMIT_SLIDING_WINDOW)
+        logger.info("Rate limiter initialized with Redis")
     
     return _rate_limiter
 
@@ -126,22 +190,28 @@ async def rate_limit_dependency(
     else:
         key = f"ip:{request.client.host}"
     
-    allowed, metadata = await limiter.check_rate_limit(
+    result = await limiter.check_rate_limit(
         key=key,
         max_requests=max_requests,
         window_seconds=window_seconds
     )
     
-    # Add rate limit headers to response (we'll do this in middleware)
-    request.state.rate_limit_metadata = metadata
+    # Add rate limit headers to response (we'll do this in middleware);
+    # they are encoded here once so the response path only appends them
+    request.state.rate_limit_metadata = result
+    request.state.rate_limit_headers = [
+        (b"x-ratelimit-limit", str(result.limit).encode()),
+        (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        (b"x-ratelimit-reset", str(result.reset).encode())
+    ]
     
-    if not allowed:
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
                 "error": "Rate limit exceeded",
-                "limit": metadata["limit"],
-                "reset": metadata["reset"],
-                "retry_after": metadata["reset"] - int(time.time())
+                "limit": result.limit,
+                "reset": result.reset,
+                "retry_after": result.reset - int(time.time())
             }
         )
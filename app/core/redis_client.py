@@ -0,0 +1,26 @@
+"""
+Shared Redis clients
+One connection pool for the Redis-backed caches, one for async callers
+"""
+import socket
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# TCP keepalive keeps idle pooled connections from being silently dropped by
+# NATs and load balancers, which would otherwise cost a reconnect
+_POOL_OPTIONS = {
+    "max_connections": settings.REDIS_MAX_CONNECTIONS,
+    "socket_keepalive": True,
+    "socket_keepalive_options": {socket.TCP_KEEPIDLE: 60} if hasattr(socket, "TCP_KEEPIDLE") else None,
+    # Short timeouts: Redis users fail open, so a slow Redis must not stall requests
+    "socket_timeout": 0.1,
+    "socket_connect_timeout": 0.1
+}
+
+redis_client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(settings.REDIS_URL, **_POOL_OPTIONS))
+
+# For code running on the event loop (rate limiting)
+async_redis_client = aioredis.Redis(connection_pool=aioredis.ConnectionPool.from_url(settings.REDIS_URL, **_POOL_OPTIONS))
@@ -3,7 +3,10 @@ Security utilities for authentication and authorization
 Handles password hashing, JWT token generation, and verification
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any
+import hashlib
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -45,6 +48,22 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_api_key(api_key: str) -> bytes:
+    """
+    Hash an API key for storage and lookup
+    
+    The raw 32-byte digest is stored, which keeps the key_hash index half
+    the size of a hex string.
+    
+    Args:
+        api_key: Raw API key
+        
+    Returns:
+        SHA-256 digest bytes
+    """
+    return hashlib.sha256(api_key.encode()).digest()
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -94,10 +113,25 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str, secret_key: str, algorithm: str) -> Dict[str, Any]:
+    """
+    Decode and verify a JWT signature, memoized per raw token
+    
+    The signing key and algorithm are part of the cache key, so rotating
+    SECRET_KEY never serves payloads verified with the old key. Invalid
+    tokens raise and are therefore never cached.
+    """
+    return jwt.decode(token, secret_key, algorithms=[algorithm])
+
+
 def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
     """
     Verify and decode a JWT token
     
+    Signature checks are cached per token; expiry is re-checked on every
+    call since a cached payload may outlive the token.
+    
     Args:
         token: JWT token string
         token_type: Expected token type ("access" or "refresh")
@@ -109,7 +143,10 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
         HTTPException: If token is invalid or expired
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = _decode_token(token, settings.SECRET_KEY, settings.ALGORITHM)
+        
+        if payload.get("exp", 0) <= time.time():
+            raise JWTError("Signature has expired.")
         
         # Verify token type
         if payload.get("type") != token_type:
@@ -118,7 +155,7 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
                 detail="Invalid token type"
             )
         
-        return payload
+        return dict(payload)
         
     except JWTError:
         raise HTTPException(
@@ -0,0 +1,104 @@
+"""
+Authenticated User Cache
+Keeps the user row needed for authentication in Redis to skip per-request SELECTs
+"""
+import time
+import orjson
+import redis
+from typing import Optional
+from uuid import UUID
+import logging
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.models.user import User
+from app.schemas.serialization import dump_row
+from app.schemas.user import UserResponse
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stop talking to Redis after an error, so an outage costs one
+# failed round trip per interval instead of one per request
+REDIS_RETRY_SECONDS = 30
+
+
+class UserCache:
+    """
+    Redis-backed cache of authenticated users
+    
+    Cached users are detached User instances: fine for reading attributes,
+    but endpoints that modify the user must load it from the session first.
+    All errors fail open to the database.
+    """
+    
+    def __init__(self, redis_client: Optional[redis.Redis], ttl_seconds: int = 300):
+        """
+        Initialize user cache
+        
+        Args:
+            redis_client: Redis client, or None to disable caching
+            ttl_seconds: Seconds before a cached user must be re-read from the database
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self._disabled_until = 0.0
+    
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"user:{user_id}"
+    
+    def _available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._disabled_until
+    
+    def _on_error(self, e: Exception):
+        logger.warning(f"User cache unavailable: {str(e)}")
+        self._disabled_until = time.monotonic() + REDIS_RETRY_SECONDS
+    
+    def get(self, user_id: UUID) -> Optional[User]:
+        """Return a detached cached user, or None on a miss or Redis error"""
+        if not self._available():
+            return None
+        
+        try:
+            cached = self.redis.get(self._key(user_id))
+        except redis.RedisError as e:
+            self._on_error(e)
+            return None
+        
+        if cached is None:
+            return None
+        
+        return User(**UserResponse.model_validate_json(cached).model_dump())
+    
+    def set(self, user: User):
+        """Cache the fields of a user needed for authentication and profile reads"""
+        if not self._available():
+            return
+        
+        try:
+            self.redis.setex(
+                self._key(user.id),
+                self.ttl_seconds,
+                orjson.dumps(dump_row(user, UserResponse))
+            )
+        except redis.RedisError as e:
+            self._on_error(e)
+    
+    def invalidate(self, user_id: UUID):
+        """Drop a cached user (after profile updates)"""
+        if not self._available():
+            return
+        
+        try:
+            self.redis.delete(self._key(user_id))
+        except redis.RedisError as e:
+            self._on_error(e)
+
+
+# Global user cache instance
+user_cache = UserCache(redis_client, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
+
+def get_user_cache() -> UserCache:
+    """Get user cache instance"""
+    return user_cache
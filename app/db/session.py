@@ -8,13 +8,24 @@ from typing import Generator
 
 from app.core.config import settings
 
+# TCP keepalive lets the kernel detect dead PostgreSQL connections, so
+# checkouts don't need a SELECT 1 round trip (pool_pre_ping) each time
+_connect_args = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3
+} if settings.DATABASE_URL.startswith("postgresql") else {}
+
 # Create database engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=20,        # Max 20 connections in pool
-    max_overflow=10,     # Allow +10 overflow connections
-    pool_recycle=3600,   # Recycle connections after 1 hour
+    connect_args=_connect_args,
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,  # Verify connections before using
+    pool_size=settings.DATABASE_POOL_SIZE,       # Persistent connections in pool
+    max_overflow=settings.DATABASE_MAX_OVERFLOW, # Overflow connections under load
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT, # Fail fast instead of queueing forever
+    pool_recycle=settings.DATABASE_POOL_RECYCLE, # Recycle stale connections
     echo=settings.DATABASE_ECHO  # Log SQL queries if enabled
 )
 
@@ -26,6 +37,10 @@ def get_db() -> Generator[Session, None, None]:
     """
     Dependency function that yields database sessions
     
+    The session is blocking, so endpoints that query it are declared with
+    plain def: FastAPI then runs them in its threadpool instead of on the
+    event loop.
+    
     Yields:
         Database session
         
@@ -4,21 +4,22 @@ Entry point for the ML Model Serving Platform
 """
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
 import time
 
 from app.core.config import settings
-from app.core.logging import setup_logging, get_logger
+from app.core.logging import setup_logging, stop_logging, get_logger
 from app.core.middleware import (
     RequestLoggingMiddleware,
     ErrorTrackingMiddleware,
-    PerformanceMonitoringMiddleware,
     RateLimitHeaderMiddleware
 )
 from app.api.v1 import auth, models, predictions, users, health, api_keys
 from app.db.base import Base
 from app.db.session import engine
+from app.core.api_key_usage import api_key_usage_tracker
+from app.core.prediction_logger import prediction_logger
 
 # Setup logging
 setup_logging()
@@ -31,7 +32,8 @@ app = FastAPI(
     description="A production-ready platform for deploying and serving ML models via REST API",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
-    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -45,8 +47,15 @@ app.add_middleware(
 
 # Add custom middleware (order matters!)
 app.add_middleware(ErrorTrackingMiddleware)
-app.add_middleware(PerformanceMonitoringMiddleware, slow_threshold_ms=1000)
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(
+    RequestLoggingMiddleware,
+    slow_threshold_ms=1000,
+    # Probes and docs are polled constantly; logging them is pure overhead
+    skip_paths=tuple(
+        f"{settings.API_V1_PREFIX}{path}"
+        for path in ("/health", "/docs", "/redoc", "/openapi.json")
+    )
+)
 app.add_middleware(RateLimitHeaderMiddleware)
 
 
@@ -59,9 +68,6 @@ app.include_router(health.router, prefix=settings.API_V1_PREFIX)
 app.include_router(api_keys.router, prefix=settings.API_V1_PREFIX)
 
 
-app.include_router(health.router, prefix=settings.API_V1_PREFIX)
-
-
 # Root endpoint
 @app.get("/", tags=["System"])
 async def root():
@@ -80,7 +86,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     """Handle all unhandled exceptions"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
@@ -104,6 +110,15 @@ async def startup_event():
     # Create database tables
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
+    
+    # Start batched API key usage writes
+    api_key_usage_tracker.start()
+    
+    # Start batched prediction log writes
+    prediction_logger.start()
+    
+    # Probe the upload directory in the background instead of per health check
+    health.start_file_system_monitor()
 
 
 # Shutdown event
@@ -111,6 +126,17 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
+    
+    # Write any pending API key usage
+    await api_key_usage_tracker.stop()
+    
+    # Write any queued prediction logs
+    await prediction_logger.stop()
+    
+    await health.stop_file_system_monitor()
+    
+    # Flush queued log records last, after everything above has logged
+    stop_logging()
 
 
 if __name__ == "__main__":
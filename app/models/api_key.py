@@ -2,11 +2,10 @@
 API Key database model
 Alternative authentication method for programmatic access
 """
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 
 from app.db.base import Base
 
@@ -17,13 +16,13 @@ class APIKey(Base):
     __tablename__ = "api_keys"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     
     # Foreign key to user
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Key information
-    key_hash = Column(String(255), unique=True, nullable=False, index=True)  # Hashed API key
+    key_hash = Column(LargeBinary(32), unique=True, nullable=False, index=True)  # SHA-256 digest of the API key
     name = Column(String(255), nullable=True)  # User-friendly name
     
     # Status
@@ -37,5 +36,15 @@ class APIKey(Base):
     # Relationships
     user = relationship("User", back_populates="api_keys")
     
+    # Indexes
+    __table_args__ = (
+        # Partial index covering only active keys, used by API key authentication
+        Index(
+            'ix_api_keys_key_hash_active',
+            'key_hash',
+            postgresql_where=(is_active == True)
+        ),
+    )
+    
     def __repr__(self) -> str:
         return f"<APIKey(id={self.id}, name={self.name})>"
@@ -2,11 +2,10 @@
 Model database model
 Represents ML model metadata and versioning
 """
-from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 
 from app.db.base import Base
 
@@ -17,7 +16,7 @@ class Model(Base):
     __tablename__ = "models"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     
     # Foreign key to user
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -31,6 +30,7 @@ class Model(Base):
     # File information
     file_path = Column(String(500), nullable=False)
     file_size = Column(BigInteger, nullable=True)  # Size in bytes
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of file contents
     
     # Status
     status = Column(String(20), default="active", index=True)  # 'active', 'deprecated', 'archived'
@@ -50,7 +50,11 @@ class Model(Base):
     
     # Constraints
     __table_args__ = (
+        # Its index also serves upload_model's latest-version lookup
+        # (user_id = ? AND name = ? ORDER BY version DESC LIMIT 1) via a backward scan
         UniqueConstraint('user_id', 'name', 'version', name='unique_user_model_version'),
+        # Serves list_models ordering and keyset pagination per user
+        Index('ix_models_user_id_created_at', 'user_id', created_at.desc(), id.desc()),
     )
     
     def __repr__(self) -> str:
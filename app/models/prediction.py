@@ -2,11 +2,10 @@
 Prediction database model
 Logs all prediction requests for analytics and debugging
 """
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 
 from app.db.base import Base
 
@@ -17,10 +16,10 @@ class Prediction(Base):
     __tablename__ = "predictions"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     
     # Foreign keys
-    model_id = Column(UUID(as_uuid=True), ForeignKey("models.id", ondelete="CASCADE"), nullable=False, index=True)
+    model_id = Column(UUID(as_uuid=True), ForeignKey("models.id", ondelete="CASCADE"), nullable=False)  # Indexed via composites below
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Prediction data (stored as JSON)
@@ -41,5 +40,23 @@ class Prediction(Base):
     model = relationship("Model", back_populates="predictions")
     user = relationship("User", back_populates="predictions")
     
+    # Indexes
+    __table_args__ = (
+        # Serves prediction history ordering and keyset pagination per user
+        Index('ix_predictions_user_id_created_at', 'user_id', created_at.desc(), id.desc()),
+        # Serves per-model analytics aggregates (count/avg ... FILTER by status)
+        Index('ix_predictions_model_id_status_created_at', 'model_id', 'status', 'created_at'),
+        # Serves the analytics daily-trend range scan (model_id = ? AND created_at >= ?),
+        # which has no status filter; also covers plain model_id lookups and FK cascades
+        Index('ix_predictions_model_id_created_at', 'model_id', created_at.desc()),
+        # Partial index for the "recent errors" lookup in model analytics
+        Index(
+            'ix_predictions_model_id_failed',
+            'model_id',
+            created_at.desc(),
+            postgresql_where=(status == 'failed')
+        ),
+    )
+    
     def __repr__(self) -> str:
         return f"<Prediction(id={self.id}, model_id={self.model_id}, status={self.status})>"
@@ -4,9 +4,8 @@ Represents users in the system
 """
 from sqlalchemy import Column, String, Boolean, DateTime
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
-import uuid
 
 from app.db.base import Base
 
@@ -17,15 +16,16 @@ class User(Base):
     __tablename__ = "users"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     
     # User information
     email = Column(String(255), unique=True, nullable=False, index=True)
-    hashed_password = Column(String(255), nullable=False)
+    # Only the login flow reads the hash; it undefers it explicitly
+    hashed_password = deferred(Column(String(255), nullable=False))
     full_name = Column(String(255), nullable=True)
     
     # Status flags
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
     
     # Timestamps
@@ -33,6 +33,10 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
+    # Kept lazy: users are loaded on every authenticated request and no
+    # response includes these collections. Queries that do need them should
+    # ask for selectinload(User.models) / selectinload(User.api_keys);
+    # predictions grow without bound and are only read through paginated queries.
     models = relationship("Model", back_populates="user", cascade="all, delete-orphan")
     predictions = relationship("Prediction", back_populates="user")
     api_keys = relationship("APIKey", back_populates="user", cascade="all, delete-orphan")
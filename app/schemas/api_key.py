@@ -57,4 +57,4 @@ class APIKeyListResponse(BaseModel):
     created_at: datetime
     prefix: str = Field(..., description="First 8 characters of the key for identification")
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -2,7 +2,7 @@
 Model schemas for request and response validation
 """
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from datetime import datetime
 from uuid import UUID
 
@@ -19,7 +19,7 @@ class ModelCreate(BaseModel):
 class ModelUpdate(BaseModel):
     """Schema for updating model metadata"""
     description: Optional[str] = None
-    status: Optional[str] = Field(None, pattern="^(active|deprecated|archived)$")
+    status: Optional[Literal["active", "deprecated", "archived"]] = None
 
 
 # Response Schemas
@@ -53,7 +53,7 @@ class ModelListResponse(BaseModel):
     prediction_count: int = 0
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ModelUploadResponse(BaseModel):
@@ -2,7 +2,7 @@
 Prediction schemas for request and response validation
 """
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 from uuid import UUID
 
@@ -17,7 +17,11 @@ class PredictionInput(BaseModel):
 
 class BatchPredictionInput(BaseModel):
     """Schema for batch prediction request"""
-    inputs: List[Dict[str, Any]] = Field(..., description="List of input data for batch prediction")
+    inputs: List[Union[Dict[str, Any], List[Any]]] = Field(
+        ...,
+        min_length=1,
+        description="List of inputs (feature objects or feature value lists) for batch prediction"
+    )
     version: Optional[int] = None
 
 
@@ -36,10 +40,18 @@ class PredictionMetadata(BaseModel):
     model_version: int
     inference_time_ms: int
     cached: bool = False
+    result_cached: bool = False
+    backend: Optional[str] = None
 
 
 class PredictionResponse(BaseModel):
-    """Schema for prediction response"""
+    """
+    Schema for prediction response
+    
+    Documents the response shape only: the prediction endpoint builds this
+    payload as a plain dict and hands it to orjson, so no models are
+    instantiated or validated per request.
+    """
     prediction: PredictionResult
     metadata: PredictionMetadata
     timestamp: datetime
@@ -77,4 +89,4 @@ class PredictionHistoryResponse(BaseModel):
     status: str
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
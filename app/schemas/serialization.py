@@ -0,0 +1,46 @@
+"""
+Response serialization helpers
+Build response dicts straight from ORM rows without Pydantic validation
+"""
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Type
+
+from pydantic import BaseModel
+
+# Marks schema fields that have no default
+_REQUIRED = object()
+
+
+@lru_cache(maxsize=None)
+def _schema_fields(schema: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """Field names of a response schema with their defaults, computed once per schema"""
+    return tuple(
+        (name, _REQUIRED if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in schema.model_fields.items()
+    )
+
+
+def dump_row(row: Any, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Serialize an ORM row to a dict shaped like a response schema
+    
+    Rows loaded from the database already have the right types, so
+    validating them again on every response only costs CPU. The schema
+    still defines which fields are exposed (and documents the response);
+    values are copied as-is and encoded by orjson, which handles UUIDs and
+    datetimes natively.
+    
+    Args:
+        row: ORM instance (or any object with the schema's attributes)
+        schema: Pydantic response schema
+    
+    Returns:
+        Dict with one entry per schema field
+    
+    Raises:
+        AttributeError: If the row lacks a field that has no default
+    """
+    return {
+        name: getattr(row, name) if default is _REQUIRED else getattr(row, name, default)
+        for name, default in _schema_fields(schema)
+    }
@@ -11,7 +11,16 @@ import enum
 from sqlalchemy import event
 
 # Connect to your Docker PostgreSQL
-engine = create_engine('sqlite:///mydb.db',echo=True)
+# Explicit pool like app/db/session.py; echo formats every statement, so it stays off
+engine = create_engine(
+    'sqlite:///mydb.db',
+    pool_size=20,
+    max_overflow=30,
+    pool_timeout=5,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    echo=False
+)
 
 class Base(DeclarativeBase):
     pass
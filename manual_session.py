@@ -0,0 +1,96 @@
+"""
+HTTP clients for the manual test scripts
+Call the app in-process by default; set USE_LIVE_SERVER=1 to go through a running server
+"""
+import contextlib
+import os
+from typing import AsyncIterator, Dict, Tuple, Type
+
+import httpx
+
+# Authorization headers by (base URL, email), so a process logs in once per user
+_login_headers: Dict[Tuple[str, str], Dict[str, str]] = {}
+
+
+def use_live_server() -> bool:
+    """Whether the scripts should talk to the server at localhost:8000"""
+    return bool(os.getenv("USE_LIVE_SERVER"))
+
+
+def make_session():
+    """
+    Create the session used by a synchronous manual script
+    
+    The in-process client runs requests through the ASGI app directly (no
+    socket, no uvicorn) and accepts the same absolute URLs as the live
+    server, so scripts don't change their BASE_URL. Scripts use it in a
+    with block: that runs the app's startup handlers (prediction log and
+    API key usage writers) and its shutdown, which flushes their buffers.
+    
+    Returns:
+        requests.Session for the live server, otherwise a FastAPI TestClient
+    """
+    if use_live_server():
+        import requests
+        return requests.Session()
+    
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+@contextlib.asynccontextmanager
+async def make_async_client(**kwargs) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Open the client used by an asyncio manual script
+    
+    In-process, the app's startup and shutdown handlers run around the
+    client, since ASGITransport does not send lifespan events.
+    
+    Args:
+        **kwargs: Extra httpx.AsyncClient options (timeout, limits, ...)
+    
+    Yields:
+        httpx.AsyncClient over TCP for the live server, otherwise over the ASGI app
+    """
+    if use_live_server():
+        async with httpx.AsyncClient(**kwargs) as client:
+            yield client
+        return
+    
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), **kwargs) as client:
+            yield client
+
+
+def connection_errors() -> Tuple[Type[Exception], ...]:
+    """Exceptions that mean the server could not be reached"""
+    if use_live_server():
+        import requests
+        return (requests.exceptions.ConnectionError, httpx.ConnectError)
+    return (httpx.ConnectError,)
+
+
+def login_headers(session, base_url: str, email: str, password: str) -> Dict[str, str]:
+    """
+    Log in once and return the bearer Authorization header
+    
+    Args:
+        session: Session or client from make_session
+        base_url: API base URL (including the /api/v1 prefix)
+        email: Account email
+        password: Account password
+    
+    Returns:
+        Headers dict; the same dict on later calls for the same user
+    
+    Raises:
+        HTTPError: If the login request fails
+    """
+    key = (base_url, email)
+    if key not in _login_headers:
+        response = session.post(f"{base_url}/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        _login_headers[key] = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+    return _login_headers[key]
@@ -2,10 +2,12 @@
 Manual test script for authentication endpoints
 Run this after starting the server with: docker-compose up
 """
-import requests
 import json
 
+from manual_session import make_session, connection_errors
+
 BASE_URL = "http://localhost:8000/api/v1"
+SESSION = make_session()
 
 def test_auth_flow():
     """Test the complete authentication flow"""
@@ -23,7 +25,7 @@ def test_auth_flow():
     
     # 1. Register
     print("\n1. Testing Registration...")
-    response = requests.post(f"{BASE_URL}/auth/register", json=test_user)
+    response = SESSION.post(f"{BASE_URL}/auth/register", json=test_user)
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
@@ -39,7 +41,7 @@ def test_auth_flow():
         "email": test_user["email"],
         "password": test_user["password"]
     }
-    response = requests.post(f"{BASE_URL}/auth/login", json=login_data)
+    response = SESSION.post(f"{BASE_URL}/auth/login", json=login_data)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -57,7 +59,7 @@ def test_auth_flow():
     # 3. Get current user info
     print("\n3. Testing Get Current User...")
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(f"{BASE_URL}/auth/me", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/auth/me", headers=headers)
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
@@ -69,7 +71,7 @@ def test_auth_flow():
     # 4. Test invalid token
     print("\n4. Testing Invalid Token...")
     headers = {"Authorization": "Bearer invalid_token"}
-    response = requests.get(f"{BASE_URL}/auth/me", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/auth/me", headers=headers)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 401:
@@ -79,7 +81,7 @@ def test_auth_flow():
     
     # 5. Test refresh token
     print("\n5. Testing Token Refresh...")
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/auth/refresh",
         json={"refresh_token": refresh_token}
     )
@@ -96,7 +98,7 @@ def test_auth_flow():
     
     # 6. Test duplicate registration
     print("\n6. Testing Duplicate Registration...")
-    response = requests.post(f"{BASE_URL}/auth/register", json=test_user)
+    response = SESSION.post(f"{BASE_URL}/auth/register", json=test_user)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 409:
@@ -110,7 +112,7 @@ def test_auth_flow():
         "email": test_user["email"],
         "password": "wrongpassword"
     }
-    response = requests.post(f"{BASE_URL}/auth/login", json=wrong_login)
+    response = SESSION.post(f"{BASE_URL}/auth/login", json=wrong_login)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 401:
@@ -125,8 +127,9 @@ def test_auth_flow():
 
 if __name__ == "__main__":
     try:
-        test_auth_flow()
-    except requests.exceptions.ConnectionError:
+        with SESSION:
+            test_auth_flow()
+    except connection_errors():
         print("❌ Error: Could not connect to the server.")
         print("Make sure the server is running with: docker-compose up")
     except Exception as e:
@@ -2,11 +2,17 @@
 Manual test script for Model Management endpoints
 Tests model upload, listing, versioning, and updates
 """
-import requests
+import asyncio
+import httpx
 import json
+import os
 from pathlib import Path
 
+from manual_session import make_async_client
+
 BASE_URL = "http://localhost:8000/api/v1"
+# VERBOSE=0 prints only titles and status codes (e.g. in CI logs)
+VERBOSE = os.getenv("VERBOSE", "1") != "0"
 
 def print_response(title, response):
     """Pretty print API response"""
@@ -14,12 +20,24 @@ def print_response(title, response):
     print(f"  {title}")
     print(f"{'='*60}")
     print(f"Status Code: {response.status_code}")
+    if not VERBOSE:
+        return
     try:
         print(json.dumps(response.json(), indent=2))
     except:
         print(response.text)
 
-def main():
+async def upload_model(client, headers, model_file, data):
+    """Upload a model file; httpx streams the open file in chunks"""
+    with open(model_file, "rb") as f:
+        return await client.post(
+            f"{BASE_URL}/models/upload",
+            headers=headers,
+            files={"file": (model_file.name, f, "application/octet-stream")},
+            data=data
+        )
+
+async def main(client: httpx.AsyncClient):
     print("\n[TEST] Testing Model Management System")
     print("="*60)
     
@@ -29,7 +47,7 @@ def main():
         "email": "testuser@example.com",
         "password": "mypassword123"
     }
-    response = requests.post(f"{BASE_URL}/auth/login", json=login_data)
+    response = await client.post(f"{BASE_URL}/auth/login", json=login_data)
     
     if response.status_code != 200:
         print("[X] Login failed!")
@@ -42,7 +60,7 @@ def main():
     
     # Step 2: List existing models
     print("\n[2] Listing existing models...")
-    response = requests.get(f"{BASE_URL}/models", headers=headers)
+    response = await client.get(f"{BASE_URL}/models", headers=headers)
     print_response("Model List", response)
     
     # Step 3: Upload a new model
@@ -53,19 +71,13 @@ def main():
         print("[X] test_model.pkl not found! Run create_test_model.py first")
         return
     
-    files = {"file": open(model_file, "rb")}
     data = {
         "name": "iris_classifier",
         "description": "Iris flower classification model",
         "model_type": "sklearn"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/models/upload",
-        headers=headers,
-        files=files,
-        data=data
-    )
+    response = await upload_model(client, headers, model_file, data)
     print_response("Model Upload", response)
     
     if response.status_code != 201:
@@ -77,7 +89,7 @@ def main():
     
     # Step 4: Get model details
     print("\n[4️⃣]  Getting model details...")
-    response = requests.get(f"{BASE_URL}/models/{model_id}", headers=headers)
+    response = await client.get(f"{BASE_URL}/models/{model_id}", headers=headers)
     print_response("Model Details", response)
     
     # Step 5: Update model
@@ -86,7 +98,7 @@ def main():
         "description": "Updated: Production-ready iris classifier",
         "status": "active"
     }
-    response = requests.patch(
+    response = await client.patch(
         f"{BASE_URL}/models/{model_id}",
         headers=headers,
         json=update_data
@@ -95,35 +107,33 @@ def main():
     
     # Step 6: Upload new version
     print("\n[6️⃣]  Uploading version 2 of the same model...")
-    files = {"file": open(model_file, "rb")}
     data = {
         "name": "iris_classifier",
         "description": "Version 2 with better accuracy",
         "model_type": "sklearn"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/models/upload",
-        headers=headers,
-        files=files,
-        data=data
-    )
+    response = await upload_model(client, headers, model_file, data)
     print_response("Version 2 Upload", response)
     
+    # Steps 7 and 8 only read, so both requests are in flight at once
+    all_models, active_models = await asyncio.gather(
+        client.get(f"{BASE_URL}/models", headers=headers),
+        client.get(f"{BASE_URL}/models?status_filter=active", headers=headers)
+    )
+    
     # Step 7: List all models again
     print("\n[7️⃣]  Listing all models (should show multiple versions)...")
-    response = requests.get(f"{BASE_URL}/models", headers=headers)
-    print_response("Updated Model List", response)
+    print_response("Updated Model List", all_models)
     
     # Step 8: Filter by status
     print("\n[8️⃣]  Filtering models by status...")
-    response = requests.get(f"{BASE_URL}/models?status_filter=active", headers=headers)
-    print_response("Active Models Only", response)
+    print_response("Active Models Only", active_models)
     
     # Step 9: Archive a model
     print("\n[9️⃣]  Archiving (soft delete) the first version...")
     update_data = {"status": "archived"}
-    response = requests.patch(
+    response = await client.patch(
         f"{BASE_URL}/models/{model_id}",
         headers=headers,
         json=update_data
@@ -132,12 +142,17 @@ def main():
     
     # Step 10: Verify archived model doesn't show in active filter
     print("\n🔟 Checking active models (archived should be excluded)...")
-    response = requests.get(f"{BASE_URL}/models?status_filter=active", headers=headers)
+    response = await client.get(f"{BASE_URL}/models?status_filter=active", headers=headers)
     print_response("Active Models After Archive", response)
     
     print("\n" + "="*60)
     print("[OK] All Model Management tests completed!")
     print("="*60)
 
+async def run():
+    # One client (and connection pool) for every request in the script
+    async with make_async_client(timeout=30.0) as client:
+        await main(client)
+
 if __name__ == "__main__":
-    main()
+    asyncio.run(run())
@@ -2,12 +2,15 @@
 Test script for Phase 5: Logging & Monitoring
 Tests analytics endpoints, health checks, and middleware
 """
-import requests
 import json
 import time
 
+from manual_session import make_session
+
 BASE_URL = "http://localhost:8000/api/v1"
-TOKEN = None
+SESSION = make_session()
+AUTH_HEADERS = {}
+ALLOWED_ERROR_CODES = frozenset({401, 403, 422})
 MODEL_ID = None
 
 
@@ -22,12 +25,13 @@ def test_health_check():
     """Test health check endpoint"""
     print_section("Testing Health Check Endpoint")
     
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
+    body = response.json()
     print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print(f"Response: {json.dumps(body, indent=2)}")
     
     assert response.status_code == 200
-    assert response.json()["status"] == "healthy"
+    assert body["status"] == "healthy"
     print("✅ Health check passed")
 
 
@@ -35,7 +39,7 @@ def test_readiness_check():
     """Test Kubernetes readiness probe"""
     print_section("Testing Readiness Check")
     
-    response = requests.get(f"{BASE_URL}/health/ready")
+    response = SESSION.get(f"{BASE_URL}/health/ready")
     print(f"Status Code: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
@@ -47,7 +51,7 @@ def test_liveness_check():
     """Test Kubernetes liveness probe"""
     print_section("Testing Liveness Check")
     
-    response = requests.get(f"{BASE_URL}/health/live")
+    response = SESSION.get(f"{BASE_URL}/health/live")
     print(f"Status Code: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
@@ -60,46 +64,49 @@ def test_request_logging():
     print_section("Testing Request Logging Middleware")
     
     print("Making request to test logging...")
-    response = requests.get(f"{BASE_URL}/health")
+    # Health probes skip the logging middleware, so use an endpoint it covers
+    response = SESSION.get(f"{BASE_URL}/models")
+    headers = response.headers
     
     # Check for custom headers
-    print(f"X-Request-ID: {response.headers.get('X-Request-ID')}")
-    print(f"X-Response-Time: {response.headers.get('X-Response-Time')}")
+    request_id = headers.get("X-Request-ID")
+    response_time = headers.get("X-Response-Time")
+    print(f"X-Request-ID: {request_id}")
+    print(f"X-Response-Time: {response_time}")
     
-    assert "X-Request-ID" in response.headers
-    assert "X-Response-Time" in response.headers
+    assert request_id is not None
+    assert response_time is not None
     print("✅ Request logging middleware working")
 
 
 def login():
     """Login to get token"""
-    global TOKEN
     
     print_section("Logging In")
     
-    response = requests.post(f"{BASE_URL}/auth/login", json={
+    response = SESSION.post(f"{BASE_URL}/auth/login", json={
         "email": "test@example.com",
         "password": "password123"
     })
     
     if response.status_code == 200:
-        TOKEN = response.json()["data"]["access_token"]
+        AUTH_HEADERS["Authorization"] = f"Bearer {response.json()['data']['access_token']}"
         print("✅ Login successful")
     else:
         print("❌ Login failed - creating new user")
         # Try registering
-        requests.post(f"{BASE_URL}/auth/register", json={
+        SESSION.post(f"{BASE_URL}/auth/register", json={
             "email": "test@example.com",
             "password": "password123",
             "full_name": "Test User"
         })
         
         # Login again
-        response = requests.post(f"{BASE_URL}/auth/login", json={
+        response = SESSION.post(f"{BASE_URL}/auth/login", json={
             "email": "test@example.com",
             "password": "password123"
         })
-        TOKEN = response.json()["data"]["access_token"]
+        AUTH_HEADERS["Authorization"] = f"Bearer {response.json()['data']['access_token']}"
         print("✅ Registered and logged in")
 
 
@@ -109,10 +116,8 @@ def get_or_create_model():
     
     print_section("Getting/Creating Model for Testing")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
     # List existing models
-    response = requests.get(f"{BASE_URL}/models", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/models", headers=AUTH_HEADERS)
     
     if response.status_code == 200:
         models = response.json()["data"]
@@ -134,18 +139,19 @@ def test_prediction_with_logging():
     
     print_section("Testing Prediction with Background Logging")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
+    # Warm up the connection so the timing below excludes connection setup
+    SESSION.get(f"{BASE_URL}/health/live")
     
     # Make a prediction
-    start_time = time.time()
-    response = requests.post(
+    start_time = time.perf_counter()
+    response = SESSION.post(
         f"{BASE_URL}/predict/{MODEL_ID}",
-        headers=headers,
+        headers=AUTH_HEADERS,
         json={
             "input": {"feature1": 1.0, "feature2": 2.0, "feature3": 3.0}
         }
     )
-    duration = time.time() - start_time
+    duration = time.perf_counter() - start_time
     
     print(f"Status Code: {response.status_code}")
     print(f"Response Time: {duration * 1000:.2f}ms")
@@ -167,12 +173,10 @@ def test_analytics_endpoint():
     
     print_section("Testing Analytics Endpoint")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
     # Get analytics
-    response = requests.get(
+    response = SESSION.get(
         f"{BASE_URL}/models/{MODEL_ID}/analytics?days=7",
-        headers=headers
+        headers=AUTH_HEADERS
     )
     
     print(f"Status Code: {response.status_code}")
@@ -190,13 +194,13 @@ def test_error_tracking():
     print_section("Testing Error Tracking Middleware")
     
     # Make an invalid request to trigger error
-    response = requests.get(f"{BASE_URL}/models/invalid-uuid")
+    response = SESSION.get(f"{BASE_URL}/models/invalid-uuid")
     
     print(f"Status Code: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
     # Should return error but not crash
-    assert response.status_code in [401, 403, 422]
+    assert response.status_code in ALLOWED_ERROR_CODES
     print("✅ Error tracking middleware working")
 
 
@@ -235,4 +239,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with SESSION:
+        main()
@@ -2,12 +2,14 @@
 Test script for Phase 6: Advanced Features
 Tests API keys, rate limiting, and other advanced features
 """
-import requests
 import json
 import time
 
+from manual_session import make_session, login_headers
+
 BASE_URL = "http://localhost:8000/api/v1"
-TOKEN = None
+SESSION = make_session()
+AUTH_HEADERS = {}
 API_KEY = None
 
 
@@ -20,21 +22,11 @@ def print_section(title):
 
 def login():
     """Login to get token"""
-    global TOKEN
     
     print_section("Logging In")
     
-    response = requests.post(f"{BASE_URL}/auth/login", json={
-        "email": "test@example.com",
-        "password": "password123"
-    })
-    
-    if response.status_code == 200:
-        TOKEN = response.json()["data"]["access_token"]
-        print("✅ Login successful")
-    else:
-        print("❌ Login failed")
-        raise Exception("Login failed")
+    AUTH_HEADERS.update(login_headers(SESSION, BASE_URL, "test@example.com", "password123"))
+    print("✅ Login successful")
 
 
 def test_create_api_key():
@@ -43,11 +35,9 @@ def test_create_api_key():
     
     print_section("Testing API Key Creation")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/api-keys",
-        headers=headers,
+        headers=AUTH_HEADERS,
         json={
             "name": "Test API Key",
             "expires_days": 30
@@ -71,9 +61,7 @@ def test_list_api_keys():
     """Test listing API keys"""
     print_section("Testing List API Keys")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
-    response = requests.get(f"{BASE_URL}/api-keys", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/api-keys", headers=AUTH_HEADERS)
     
     print(f"Status Code: {response.status_code}")
     
@@ -98,13 +86,14 @@ def test_api_key_authentication():
     # Test with API key instead of Bearer token
     headers = {"X-API-Key": API_KEY}
     
-    response = requests.get(f"{BASE_URL}/models", headers=headers)
+    # One-item page: the total comes from pagination, not from decoding every model
+    response = SESSION.get(f"{BASE_URL}/models?per_page=1&include_total=true", headers=headers)
     
     print(f"Status Code: {response.status_code}")
     
     if response.status_code == 200:
         print("✅ API key authentication successful")
-        print(f"Models Count: {len(response.json()['data'])}")
+        print(f"Models Count: {response.json()['pagination']['total_items']}")
     else:
         print(f"❌ Failed: {response.text}")
 
@@ -113,9 +102,7 @@ def test_rate_limit_headers():
     """Test rate limit headers in response"""
     print_section("Testing Rate Limit Headers")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
-    response = requests.get(f"{BASE_URL}/health", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/health", headers=AUTH_HEADERS)
     
     print(f"Status Code: {response.status_code}")
     print(f"X-RateLimit-Limit: {response.headers.get('X-RateLimit-Limit', 'Not set')}")
@@ -134,10 +121,8 @@ def test_update_api_key():
     
     print_section("Testing Update API Key")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
     # First, get the key ID
-    response = requests.get(f"{BASE_URL}/api-keys", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/api-keys", headers=AUTH_HEADERS)
     if response.status_code != 200:
         print("❌ Failed to get API keys")
         return
@@ -150,9 +135,9 @@ def test_update_api_key():
     key_id = keys[0]["id"]
     
     # Update the key
-    response = requests.patch(
+    response = SESSION.patch(
         f"{BASE_URL}/api-keys/{key_id}",
-        headers=headers,
+        headers=AUTH_HEADERS,
         json={
             "name": "Updated Test Key",
             "is_active": True
@@ -172,12 +157,10 @@ def test_revoke_api_key():
     """Test revoking an API key"""
     print_section("Testing Revoke API Key")
     
-    headers = {"Authorization": f"Bearer {TOKEN}"}
-    
     # Create a temporary key to revoke
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/api-keys",
-        headers=headers,
+        headers=AUTH_HEADERS,
         json={
             "name": "Temporary Key for Deletion",
             "expires_days": 1
@@ -191,9 +174,9 @@ def test_revoke_api_key():
     key_id = response.json()["data"]["id"]
     
     # Revoke it
-    response = requests.delete(
+    response = SESSION.delete(
         f"{BASE_URL}/api-keys/{key_id}",
-        headers=headers
+        headers=AUTH_HEADERS
     )
     
     print(f"Status Code: {response.status_code}")
@@ -210,7 +193,7 @@ def test_invalid_api_key():
     
     headers = {"X-API-Key": "mlp_invalid_key_12345"}
     
-    response = requests.get(f"{BASE_URL}/models", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/models", headers=headers)
     
     print(f"Status Code: {response.status_code}")
     
@@ -263,4 +246,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with SESSION:
+        main()
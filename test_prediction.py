@@ -1,37 +1,37 @@
-import requests
 import json
 
-BASE_URL = "http://localhost:8000/api/v1"
-
-# Login
-login_data = {"email": "testuser@example.com", "password": "mypassword123"}
-response = requests.post(f"{BASE_URL}/auth/login", json=login_data)
-token = response.json()["data"]["access_token"]
-headers = {"Authorization": f"Bearer {token}"}
+from manual_session import make_session, login_headers
 
-# Get model ID
-model_id = "a6505c93-d2eb-4979-b0ab-2e4b439c9827"
+BASE_URL = "http://localhost:8000/api/v1"
+SESSION = make_session()
 
-# Make prediction
-prediction_data = {
-    "input": {
-        "feature1": 0.5,
-        "feature2": -0.5,
-        "feature3": 1.0,
-        "feature4": -1.0
+with SESSION:
+    # Login
+    headers = login_headers(SESSION, BASE_URL, "testuser@example.com", "mypassword123")
+    
+    # Get model ID
+    model_id = "a6505c93-d2eb-4979-b0ab-2e4b439c9827"
+    
+    # Make prediction
+    prediction_data = {
+        "input": {
+            "feature1": 0.5,
+            "feature2": -0.5,
+            "feature3": 1.0,
+            "feature4": -1.0
+        }
     }
-}
-
-print(f"\n[PREDICTION TEST]")
-print(f"Model ID: {model_id}")
-print(f"Input: {prediction_data['input']}")
-print("="*60)
-
-response = requests.post(
-    f"{BASE_URL}/predict/{model_id}",
-    headers=headers,
-    json=prediction_data
-)
-
-print(f"\nStatus: {response.status_code}")
-print(json.dumps(response.json(), indent=2))
+    
+    print(f"\n[PREDICTION TEST]")
+    print(f"Model ID: {model_id}")
+    print(f"Input: {prediction_data['input']}")
+    print("="*60)
+    
+    response = SESSION.post(
+        f"{BASE_URL}/predict/{model_id}",
+        headers=headers,
+        json=prediction_data
+    )
+    
+    print(f"\nStatus: {response.status_code}")
+    print(json.dumps(response.json(), indent=2))
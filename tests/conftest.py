@@ -1,56 +1,158 @@
 """Test configuration and fixtures"""
 import pytest
 import tempfile
+import logging
 import os
+import uuid
+from functools import lru_cache
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.main import app
 from app.db.base import Base
 from app.db.session import get_db
 from app.models.user import User
-from app.models.model import Model
+from app.core.config import settings
+from app.core import security
 from app.core.security import get_password_hash
+from app.core import api_key_usage as api_key_usage_module
+from app.core import prediction_logger as prediction_logger_module
+from app.core.api_key_cache import api_key_cache
+from app.core.prediction_cache import prediction_cache
+from app.core.user_cache import user_cache
+
+from factories import auth_headers_for, make_model, make_user
 
 # Use PostgreSQL test database (same as dev but different schema)
 SQLALCHEMY_DATABASE_URL = "postgresql://mluser:mlpassword@db:5432/mlplatform"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Under pytest-xdist (pytest -n auto) every worker gets its own schema and
+# upload directory, so workers never see each other's rows or files
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER")
+TEST_SCHEMA = f"test_{WORKER_ID}" if WORKER_ID else None
+
+if WORKER_ID:
+    settings.UPLOAD_DIR = os.path.join(settings.UPLOAD_DIR, WORKER_ID)
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"options": f"-csearch_path={TEST_SCHEMA}"} if TEST_SCHEMA else {}
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# app.main configures INFO logging on import; per-request access logs only add
+# noise to test output, while warnings and errors still show up on failures
+logging.getLogger().setLevel(logging.WARNING)
+
+# Fixed ids for the fixture users
+TEST_USER_ID = uuid.UUID("00000000-0000-4000-8000-000000000001")
+ADMIN_USER_ID = uuid.UUID("00000000-0000-4000-8000-000000000002")
+
+
+@lru_cache(maxsize=None)
+def _password_hash(password: str) -> str:
+    """
+    Hash a fixture password once per session instead of once per test
+    
+    Every fixture user with the same password shares one salted hash; no
+    test compares hashes, only verifies passwords against them.
+    """
+    return get_password_hash(password)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database():
     """Setup test database before all tests"""
+    if TEST_SCHEMA:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+    
     # Drop all tables and recreate them
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     yield
     # Cleanup after all tests
     Base.metadata.drop_all(bind=engine)
+    
+    if TEST_SCHEMA:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """
+    Hash passwords with the cheapest argon2 parameters during tests
+    
+    Registration and login still hash and verify for real; only the
+    deliberately slow production cost is dropped.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(security, "pwd_context", CryptContext(
+            schemes=["argon2"],
+            argon2__time_cost=1,
+            argon2__memory_cost=8,
+            argon2__parallelism=1
+        ))
+        yield
 
 
 @pytest.fixture(scope="function")
-def db():
-    """Create test database session with automatic cleanup"""
-    session = TestingSessionLocal()
+def db(monkeypatch):
+    """Create test database session whose changes are rolled back after the test"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    
+    # Commits from tests and endpoints only release SAVEPOINTs inside the
+    # outer transaction, so one ROLLBACK undoes everything the test wrote
+    BoundSession = sessionmaker(
+        bind=connection,
+        autoflush=False,
+        join_transaction_mode="create_savepoint"
+    )
+    
+    # Buffered writers open their own sessions; keep them in the same transaction
+    monkeypatch.setattr(prediction_logger_module, "SessionLocal", BoundSession)
+    monkeypatch.setattr(api_key_usage_module, "SessionLocal", BoundSession)
+    
+    session = BoundSession()
     try:
         yield session
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
     finally:
-        # Clean up all data after each test (in reverse order to handle foreign keys)
-        for table in reversed(Base.metadata.sorted_tables):
-            session.execute(table.delete())
-        session.commit()
         session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state(monkeypatch):
+    """
+    Start every test with empty process-wide buffers and caches
+    
+    Rows buffered by an earlier test belong to a transaction that was
+    already rolled back, and cached keys, users and tokens may point at
+    rows that no longer exist. The Redis-backed caches are disabled; tests
+    that need one install their own.
+    """
+    prediction_logger_module.prediction_logger._pending.clear()
+    api_key_usage_module.api_key_usage_tracker._pending.clear()
+    api_key_cache.clear()
+    security._decode_token.cache_clear()
+    monkeypatch.setattr(user_cache, "redis", None)
+    monkeypatch.setattr(prediction_cache, "redis", None)
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Test client shared by the whole session; only the db override changes per test"""
+    return TestClient(app)
 
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(app_client: TestClient, db):
     """Create test client"""
     def override_get_db():
         try:
@@ -59,67 +161,56 @@ def client(db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
+    yield app_client
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
 def test_user(db: Session):
     """Create a test user"""
-    user = User(
-        email="test@example.com",
-        hashed_password=get_password_hash("password123"),
+    return make_user(
+        db,
+        "test@example.com",
+        _password_hash("password123"),
+        id=TEST_USER_ID,
         full_name="Test User",
-        is_active=True,
         is_admin=False
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
 
 
 @pytest.fixture
 def admin_user(db: Session):
     """Create an admin user"""
-    user = User(
-        email="admin@example.com",
-        hashed_password=get_password_hash("admin123"),
+    return make_user(
+        db,
+        "admin@example.com",
+        _password_hash("admin123"),
+        id=ADMIN_USER_ID,
         full_name="Admin User",
-        is_active=True,
         is_admin=True
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
 
 
 @pytest.fixture
-def auth_headers(client: TestClient, test_user: User):
+def auth_headers(test_user: User):
     """Get authentication headers for test user"""
-    response = client.post(
-        "/api/v1/auth/login",
-        json={"email": "test@example.com", "password": "password123"}
-    )
-    token = response.json()["data"]["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+    return auth_headers_for(test_user)
 
 
 @pytest.fixture
-def admin_headers(client: TestClient, admin_user: User):
+def admin_headers(admin_user: User):
     """Get authentication headers for admin user"""
-    response = client.post(
-        "/api/v1/auth/login",
-        json={"email": "admin@example.com", "password": "admin123"}
-    )
-    token = response.json()["data"]["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+    return auth_headers_for(admin_user)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def temp_model_file():
-    """Create a temporary model file for testing"""
+    """
+    Create a temporary model file for testing
+    
+    Dumped once per session: tests only read it (uploads copy its bytes and
+    deleting a model never removes files), so every test can share it.
+    """
     import joblib
     from sklearn.linear_model import LogisticRegression
     
@@ -138,20 +229,34 @@ def temp_model_file():
         os.remove(temp_file.name)
 
 
+@pytest.fixture(scope="session")
+def model_bytes(temp_model_file: str) -> bytes:
+    """Contents of the temporary model file, read once for the upload tests"""
+    with open(temp_model_file, 'rb') as f:
+        return f.read()
+
+
 @pytest.fixture
 def test_model(db: Session, test_user: User, temp_model_file: str):
     """Create a test model in the database"""
-    model = Model(
-        user_id=test_user.id,
-        name="test_model",
+    return make_model(
+        db,
+        test_user,
         description="Test model for testing",
-        model_type="sklearn",
-        version=1,
-        file_path=temp_model_file,
-        file_size=1024,
-        status="active"
+        file_path=temp_model_file
     )
-    db.add(model)
-    db.commit()
-    db.refresh(model)
-    return model
+
+
+@pytest.fixture
+def count_queries():
+    """Count SQL statements executed on the test engine (pass as a list, read len)"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # SAVEPOINTs come from the db fixture's rollback wrapper, not the app
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,101 @@
+"""
+Test data factories
+Create rows straight through the ORM session for tests that only need them as setup
+"""
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.api.v1.api_keys import generate_api_key
+from app.core.security import create_access_token, hash_api_key
+from app.models.api_key import APIKey
+from app.models.model import Model
+from app.models.user import User
+
+
+def make_user(db: Session, email: str, hashed_password: str, **kw) -> User:
+    """
+    Insert a user
+    
+    Args:
+        db: Test database session
+        email: User email
+        hashed_password: Already hashed password (hashing is the slow part)
+        **kw: Other User columns (id, full_name, is_admin, ...)
+    
+    Returns:
+        The committed User
+    """
+    user = User(email=email, hashed_password=hashed_password, **{"is_active": True, **kw})
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def make_model(db: Session, user: User, **kw) -> Model:
+    """
+    Insert a model owned by a user
+    
+    Args:
+        db: Test database session
+        user: Owner
+        **kw: Model columns overriding the defaults (name, version, file_path, ...)
+    
+    Returns:
+        The committed Model
+    """
+    fields = {
+        "name": "test_model",
+        "model_type": "sklearn",
+        "version": 1,
+        "file_path": "/tmp/test_model.pkl",
+        "file_size": 1024,
+        "status": "active",
+        **kw,
+    }
+    model = Model(user_id=user.id, **fields)
+    db.add(model)
+    db.commit()
+    db.refresh(model)
+    return model
+
+
+def make_api_key(
+    db: Session,
+    user: User,
+    name: Optional[str] = "Test Key",
+    **kw
+) -> Tuple[APIKey, str]:
+    """
+    Insert an API key for a user
+    
+    Args:
+        db: Test database session
+        user: Owner
+        name: Key name
+        **kw: Other APIKey columns (is_active, expires_at, ...)
+    
+    Returns:
+        The committed APIKey and the plain key to send in X-API-Key
+    """
+    api_key = generate_api_key()
+    db_api_key = APIKey(user_id=user.id, key_hash=hash_api_key(api_key), name=name, **kw)
+    db.add(db_api_key)
+    db.commit()
+    db.refresh(db_api_key)
+    return db_api_key, api_key
+
+
+def auth_headers_for(user: User) -> Dict[str, str]:
+    """
+    Bearer Authorization headers for a user, signed directly instead of logging in
+    
+    Args:
+        user: User to authenticate as
+    
+    Returns:
+        Headers dict with an access token like the one /auth/login issues
+    """
+    access_token = create_access_token(data={"user_id": str(user.id)})
+    return {"Authorization": f"Bearer {access_token}"}
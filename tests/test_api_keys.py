@@ -8,6 +8,8 @@ from sqlalchemy.orm import Session
 from app.models.api_key import APIKey
 from app.models.user import User
 
+from factories import make_api_key
+
 
 class TestAPIKeyCreation:
     """Test API key creation"""
@@ -63,14 +65,10 @@ class TestAPIKeyListing:
         data = response.json()
         assert len(data["data"]) == 0
     
-    def test_list_api_keys_with_data(self, client: TestClient, auth_headers: dict):
+    def test_list_api_keys_with_data(self, client: TestClient, auth_headers: dict, db: Session, test_user: User):
         """Test listing with existing keys"""
         # Create a key first
-        client.post(
-            "/api/v1/api-keys",
-            headers=auth_headers,
-            json={"name": "Test Key"}
-        )
+        make_api_key(db, test_user, name="Test Key")
         
         response = client.get("/api/v1/api-keys", headers=auth_headers)
         
@@ -84,15 +82,11 @@ class TestAPIKeyListing:
 class TestAPIKeyAuthentication:
     """Test authentication using API keys"""
     
-    def test_auth_with_api_key(self, client: TestClient, auth_headers: dict):
+    def test_auth_with_api_key(self, client: TestClient, db: Session, test_user: User, count_queries: list):
         """Test authenticating with API key"""
         # Create API key
-        create_response = client.post(
-            "/api/v1/api-keys",
-            headers=auth_headers,
-            json={"name": "Auth Test Key"}
-        )
-        api_key = create_response.json()["data"]["api_key"]
+        api_key = make_api_key(db, test_user, name="Auth Test Key")[1]
+        count_queries.clear()
         
         # Use API key to authenticate
         response = client.get(
@@ -103,6 +97,9 @@ class TestAPIKeyAuthentication:
         assert response.status_code == 200
         data = response.json()
         assert data["data"]["email"] == "test@example.com"
+        
+        # Key and owner come back in one query, with no lazy loads after it
+        assert len(count_queries) == 1
     
     def test_auth_with_invalid_api_key(self, client: TestClient):
         """Test authenticating with invalid API key"""
@@ -113,16 +110,11 @@ class TestAPIKeyAuthentication:
         
         assert response.status_code == 401
     
-    def test_auth_with_inactive_api_key(self, client: TestClient, auth_headers: dict):
+    def test_auth_with_inactive_api_key(self, client: TestClient, auth_headers: dict, db: Session, test_user: User):
         """Test authenticating with deactivated API key"""
         # Create API key
-        create_response = client.post(
-            "/api/v1/api-keys",
-            headers=auth_headers,
-            json={"name": "Inactive Key"}
-        )
-        key_id = create_response.json()["data"]["id"]
-        api_key = create_response.json()["data"]["api_key"]
+        db_key, api_key = make_api_key(db, test_user, name="Inactive Key")
+        key_id = db_key.id
         
         # Deactivate it
         client.patch(
@@ -138,65 +130,123 @@ class TestAPIKeyAuthentication:
         )
         
         assert response.status_code == 401
-
-
-class TestAPIKeyUpdate:
-    """Test API key updates"""
     
-    def test_update_api_key_name(self, client: TestClient, auth_headers: dict):
-        """Test updating API key name"""
-        # Create key
-        create_response = client.post(
-            "/api/v1/api-keys",
-            headers=auth_headers,
-            json={"name": "Original Name"}
-        )
-        key_id = create_response.json()["data"]["id"]
+    def test_auth_with_api_key_deactivated_after_use(self, client: TestClient, auth_headers: dict, db: Session, test_user: User):
+        """Test that deactivating a recently used (cached) API key takes effect immediately"""
+        db_key, api_key = make_api_key(db, test_user, name="Cached Key")
+        key_id = db_key.id
         
-        # Update name
-        response = client.patch(
+        # Use it once so it gets cached
+        response = client.get("/api/v1/auth/me", headers={"X-API-Key": api_key})
+        assert response.status_code == 200
+        
+        # Deactivate it
+        client.patch(
             f"/api/v1/api-keys/{key_id}",
             headers=auth_headers,
-            json={"name": "Updated Name"}
+            json={"is_active": False}
         )
         
+        response = client.get("/api/v1/auth/me", headers={"X-API-Key": api_key})
+        assert response.status_code == 401
+    
+    def test_auth_with_revoked_api_key(self, client: TestClient, auth_headers: dict, db: Session, test_user: User):
+        """Test that revoking a recently used (cached) API key takes effect immediately"""
+        db_key, api_key = make_api_key(db, test_user, name="Revoked Key")
+        key_id = db_key.id
+        
+        response = client.get("/api/v1/auth/me", headers={"X-API-Key": api_key})
         assert response.status_code == 200
-        data = response.json()
-        assert data["data"]["name"] == "Updated Name"
+        
+        client.delete(f"/api/v1/api-keys/{key_id}", headers=auth_headers)
+        
+        response = client.get("/api/v1/auth/me", headers={"X-API-Key": api_key})
+        assert response.status_code == 401
+
     
-    def test_update_api_key_status(self, client: TestClient, auth_headers: dict):
-        """Test updating API key active status"""
-        # Create key
-        create_response = client.post(
-            "/api/v1/api-keys",
-            headers=auth_headers,
-            json={"name": "Test Key"}
-        )
-        key_id = create_response.json()["data"]["id"]
+    def test_auth_with_expired_api_key(self, client: TestClient, db: Session, test_user: User):
+        """Test authenticating with an expired API key"""
+        from datetime import datetime, timedelta, timezone
+        
+        api_key = make_api_key(
+            db,
+            test_user,
+            name="Expired Key",
+            expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+        )[1]
+        
+        response = client.get("/api/v1/auth/me", headers={"X-API-Key": api_key})
+        assert response.status_code == 401
+    
+    def test_api_key_usage_recorded(self, client: TestClient, db: Session, test_user: User):
+        """Test that last_used_at is written when buffered usage is flushed"""
+        from app.core.api_key_usage import api_key_usage_tracker
+        
+        db_key, api_key = make_api_key(db, test_user, name="Usage Key")
+        
+        client.get("/api/v1/auth/me", headers={"X-API-Key": api_key})
+        api_key_usage_tracker.flush()
+        
+        # The flush wrote through its own session; reload the factory's copy
+        db.refresh(db_key)
+        assert db_key.last_used_at is not None
+    
+    def test_uncached_api_key_looked_up_once_under_concurrency(self, db: Session, test_user: User):
+        """Test that concurrent requests with an uncached key share a single database lookup"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+        from app.api.dependencies import get_user_from_api_key
+        
+        db_key, api_key = make_api_key(db, test_user, name="Burst Key")
+        lookups = []
+        
+        class SlowSession:
+            """Stands in for the request's Session, recording API key queries"""
+            def execute(self, statement):
+                lookups.append(statement)
+                time.sleep(0.05)
+                return SimpleNamespace(scalar_one_or_none=lambda: db_key)
+            
+            def get(self, model, ident):
+                return test_user
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            users = list(pool.map(lambda _: get_user_from_api_key(api_key, SlowSession()), range(8)))
+        
+        assert len(lookups) == 1
+        assert all(user is test_user for user in users)
+
+class TestAPIKeyUpdate:
+    """Test API key updates"""
+    
+    @pytest.mark.parametrize("update", [
+        {"name": "Updated Name"},
+        {"is_active": False},
+    ])
+    def test_update_api_key(self, client: TestClient, auth_headers: dict, db: Session, test_user: User, update: dict):
+        """Test updating API key name and active status"""
+        key_id = make_api_key(db, test_user, name="Original Name")[0].id
         
-        # Deactivate
         response = client.patch(
             f"/api/v1/api-keys/{key_id}",
             headers=auth_headers,
-            json={"is_active": False}
+            json=update
         )
         
         assert response.status_code == 200
-        assert response.json()["data"]["is_active"] is False
+        data = response.json()["data"]
+        for field, value in update.items():
+            assert data[field] == value
 
 
 class TestAPIKeyRevocation:
     """Test API key revocation (deletion)"""
     
-    def test_revoke_api_key(self, client: TestClient, auth_headers: dict):
+    def test_revoke_api_key(self, client: TestClient, auth_headers: dict, db: Session, test_user: User):
         """Test revoking an API key"""
         # Create key
-        create_response = client.post(
-            "/api/v1/api-keys",
-            headers=auth_headers,
-            json={"name": "To Be Revoked"}
-        )
-        key_id = create_response.json()["data"]["id"]
+        key_id = make_api_key(db, test_user, name="To Be Revoked")[0].id
         
         # Revoke it
         response = client.delete(
@@ -207,11 +257,7 @@ class TestAPIKeyRevocation:
         assert response.status_code == 204
         
         # Verify it's gone
-        get_response = client.get(
-            f"/api/v1/api-keys/{key_id}",
-            headers=auth_headers
-        )
-        assert get_response.status_code == 404
+        assert db.get(APIKey, key_id) is None
     
     def test_revoke_nonexistent_key(self, client: TestClient, auth_headers: dict):
         """Test revoking non-existent key"""
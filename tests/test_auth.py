@@ -1,7 +1,9 @@
 """Tests for authentication endpoints"""
-import pytest
+import redis
 from fastapi import status
 
+from app.core.user_cache import UserCache
+
 
 def test_register_user(client):
     """Test user registration"""
@@ -19,18 +21,9 @@ def test_register_user(client):
     assert data["data"]["user"]["email"] == "test@example.com"
 
 
-def test_register_duplicate_email(client):
+def test_register_duplicate_email(client, test_user):
     """Test registration with duplicate email"""
-    # Register first user
-    client.post(
-        "/api/v1/auth/register",
-        json={
-            "email": "test@example.com",
-            "password": "TestPass123!",
-        }
-    )
-    
-    # Try to register again with same email
+    # Try to register again with the existing user's email
     response = client.post(
         "/api/v1/auth/register",
         json={
@@ -41,23 +34,13 @@ def test_register_duplicate_email(client):
     assert response.status_code == status.HTTP_409_CONFLICT
 
 
-def test_login(client):
+def test_login(client, test_user):
     """Test user login"""
-    # Register user first
-    client.post(
-        "/api/v1/auth/register",
-        json={
-            "email": "test@example.com",
-            "password": "TestPass123!",
-        }
-    )
-    
-    # Login
     response = client.post(
         "/api/v1/auth/login",
         json={
             "email": "test@example.com",
-            "password": "TestPass123!",
+            "password": "password123",
         }
     )
     assert response.status_code == status.HTTP_200_OK
@@ -67,7 +50,7 @@ def test_login(client):
     assert "refresh_token" in data["data"]
 
 
-def test_login_invalid_credentials(client):
+def test_login_invalid_credentials(client, test_user):
     """Test login with invalid credentials"""
     response = client.post(
         "/api/v1/auth/login",
@@ -77,3 +60,47 @@ def test_login_invalid_credentials(client):
         }
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands used by UserCache"""
+    
+    def __init__(self):
+        self.store = {}
+    
+    def get(self, key):
+        return self.store.get(key)
+    
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+    
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+class BrokenRedis:
+    """Redis client whose every command fails"""
+    
+    def get(self, key):
+        raise redis.ConnectionError("down")
+
+
+def test_user_cache_round_trip(test_user):
+    """Test that a cached user comes back with the same fields"""
+    cache = UserCache(FakeRedis())
+    cache.set(test_user)
+    
+    cached = cache.get(test_user.id)
+    assert cached.id == test_user.id
+    assert cached.email == test_user.email
+    assert cached.is_active is True
+    
+    cache.invalidate(test_user.id)
+    assert cache.get(test_user.id) is None
+
+
+def test_user_cache_fails_open(test_user):
+    """Test that Redis errors are treated as cache misses"""
+    cache = UserCache(BrokenRedis())
+    
+    assert cache.get(test_user.id) is None
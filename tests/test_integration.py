@@ -4,12 +4,16 @@ Tests end-to-end user journeys
 """
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from factories import auth_headers_for, make_user
 
+
+@pytest.mark.slow
 class TestCompleteUserJourney:
     """Test complete user workflow from registration to prediction"""
     
-    def test_full_workflow(self, client: TestClient, temp_model_file: str):
+    def test_full_workflow(self, client: TestClient, model_bytes: bytes):
         """
         Test complete workflow:
         1. Register user
@@ -48,17 +52,16 @@ class TestCompleteUserJourney:
         assert me_response.json()["data"]["email"] == "journey@example.com"
         
         # 4. Upload model
-        with open(temp_model_file, 'rb') as f:
-            upload_response = client.post(
-                "/api/v1/models/upload",
-                headers=headers,
-                data={
-                    "name": "journey_model",
-                    "description": "Test journey model",
-                    "model_type": "sklearn"
-                },
-                files={"file": ("model.pkl", f, "application/octet-stream")}
-            )
+        upload_response = client.post(
+            "/api/v1/models/upload",
+            headers=headers,
+            data={
+                "name": "journey_model",
+                "description": "Test journey model",
+                "model_type": "sklearn"
+            },
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
         assert upload_response.status_code == 201
         model_id = upload_response.json()["data"]["model"]["id"]
         
@@ -88,78 +91,51 @@ class TestCompleteUserJourney:
         assert "statistics" in analytics_response.json()["data"]
 
 
+@pytest.mark.slow
 class TestMultiUserInteractions:
     """Test interactions between multiple users"""
     
-    def test_user_isolation(self, client: TestClient, temp_model_file: str):
+    def test_user_isolation(self, client: TestClient, db: Session, model_bytes: bytes):
         """Test that users can only see their own models"""
-        # User 1 - Register and Login
-        client.post(
-            "/api/v1/auth/register",
-            json={
-                "email": "user1@example.com",
-                "password": "password123",
-                "full_name": "User One"
-            }
-        )
-        user1_login = client.post(
-            "/api/v1/auth/login",
-            json={"email": "user1@example.com", "password": "password123"}
-        )
-        user1_token = user1_login.json()["data"]["access_token"]
-        user1_headers = {"Authorization": f"Bearer {user1_token}"}
-        
-        # User 2 - Register and Login
-        client.post(
-            "/api/v1/auth/register",
-            json={
-                "email": "user2@example.com",
-                "password": "password123",
-                "full_name": "User Two"
-            }
-        )
-        user2_login = client.post(
-            "/api/v1/auth/login",
-            json={"email": "user2@example.com", "password": "password123"}
-        )
-        user2_token = user2_login.json()["data"]["access_token"]
-        user2_headers = {"Authorization": f"Bearer {user2_token}"}
+        # Registration and login are covered in test_auth.py; only the data matters here
+        user1 = make_user(db, "user1@example.com", "unused", full_name="User One")
+        user2 = make_user(db, "user2@example.com", "unused", full_name="User Two")
+        user1_headers = auth_headers_for(user1)
+        user2_headers = auth_headers_for(user2)
         
         # User 1 uploads model
-        with open(temp_model_file, 'rb') as f:
-            user1_upload = client.post(
-                "/api/v1/models/upload",
-                headers=user1_headers,
-                data={"name": "user1_model", "model_type": "sklearn"},
-                files={"file": ("model.pkl", f, "application/octet-stream")}
-            )
+        user1_upload = client.post(
+            "/api/v1/models/upload",
+            headers=user1_headers,
+            data={"name": "user1_model", "model_type": "sklearn"},
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
         user1_model_id = user1_upload.json()["data"]["model"]["id"]
         
         # User 2 uploads model
-        with open(temp_model_file, 'rb') as f:
-            user2_upload = client.post(
-                "/api/v1/models/upload",
-                headers=user2_headers,
-                data={"name": "user2_model", "model_type": "sklearn"},
-                files={"file": ("model.pkl", f, "application/octet-stream")}
-            )
+        user2_upload = client.post(
+            "/api/v1/models/upload",
+            headers=user2_headers,
+            data={"name": "user2_model", "model_type": "sklearn"},
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
         
         # User 1 should only see their model
-        user1_models = client.get("/api/v1/models", headers=user1_headers)
-        assert len(user1_models.json()["data"]) == 1
-        assert user1_models.json()["data"][0]["name"] == "user1_model"
+        user1_models = client.get("/api/v1/models", headers=user1_headers).json()["data"]
+        assert len(user1_models) == 1
+        assert user1_models[0]["name"] == "user1_model"
         
         # User 2 should only see their model
-        user2_models = client.get("/api/v1/models", headers=user2_headers)
-        assert len(user2_models.json()["data"]) == 1
-        assert user2_models.json()["data"][0]["name"] == "user2_model"
+        user2_models = client.get("/api/v1/models", headers=user2_headers).json()["data"]
+        assert len(user2_models) == 1
+        assert user2_models[0]["name"] == "user2_model"
         
-        # User 2 should not be able to access User 1's model
+        # User 2 should not be able to see User 1's model
         user2_access = client.get(
             f"/api/v1/models/{user1_model_id}",
             headers=user2_headers
         )
-        assert user2_access.status_code == 403
+        assert user2_access.status_code == 404
 
 
 class TestHealthAndMonitoring:
@@ -189,6 +165,17 @@ class TestHealthAndMonitoring:
         
         assert response.status_code == 200
         assert response.json()["status"] == "alive"
+    
+    def test_request_timing_headers(self, client: TestClient):
+        """Test that the logging middleware tags responses"""
+        first = client.get("/")
+        second = client.get("/")
+        
+        assert first.headers["X-Request-ID"] != second.headers["X-Request-ID"]
+        assert first.headers["X-Response-Time"].endswith("ms")
+        
+        # Health probes skip request logging
+        assert "X-Request-ID" not in client.get("/api/v1/health/live").headers
 
 
 class TestErrorHandling:
@@ -1,31 +1,31 @@
 """
 Comprehensive tests for model management endpoints
 """
-import pytest
-import io
+import os
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.model import Model
+from app.models.prediction import Prediction
 from app.models.user import User
 
 
 class TestModelUpload:
     """Test model upload functionality"""
     
-    def test_upload_model_success(self, client: TestClient, auth_headers: dict, temp_model_file: str):
+    def test_upload_model_success(self, client: TestClient, auth_headers: dict, model_bytes: bytes):
         """Test successful model upload"""
-        with open(temp_model_file, 'rb') as f:
-            response = client.post(
-                "/api/v1/models/upload",
-                headers=auth_headers,
-                data={
-                    "name": "test_classifier",
-                    "description": "Test model",
-                    "model_type": "sklearn"
-                },
-                files={"file": ("model.pkl", f, "application/octet-stream")}
-            )
+        response = client.post(
+            "/api/v1/models/upload",
+            headers=auth_headers,
+            data={
+                "name": "test_classifier",
+                "description": "Test model",
+                "model_type": "sklearn"
+            },
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
         
         assert response.status_code == 201
         data = response.json()
@@ -34,50 +34,83 @@ class TestModelUpload:
         assert data["data"]["model"]["model_type"] == "sklearn"
         assert data["data"]["model"]["version"] == 1
     
-    def test_upload_model_versioning(self, client: TestClient, auth_headers: dict, temp_model_file: str):
+    def test_upload_model_versioning(self, client: TestClient, auth_headers: dict, model_bytes: bytes):
         """Test automatic versioning on model upload"""
         # Upload first version
-        with open(temp_model_file, 'rb') as f:
-            response1 = client.post(
-                "/api/v1/models/upload",
-                headers=auth_headers,
-                data={
-                    "name": "versioned_model",
-                    "model_type": "sklearn"
-                },
-                files={"file": ("model.pkl", f, "application/octet-stream")}
-            )
+        response1 = client.post(
+            "/api/v1/models/upload",
+            headers=auth_headers,
+            data={
+                "name": "versioned_model",
+                "model_type": "sklearn"
+            },
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
         
         assert response1.json()["data"]["model"]["version"] == 1
         
         # Upload second version
-        with open(temp_model_file, 'rb') as f:
-            response2 = client.post(
-                "/api/v1/models/upload",
-                headers=auth_headers,
-                data={
-                    "name": "versioned_model",
-                    "model_type": "sklearn"
-                },
-                files={"file": ("model.pkl", f, "application/octet-stream")}
-            )
+        response2 = client.post(
+            "/api/v1/models/upload",
+            headers=auth_headers,
+            data={
+                "name": "versioned_model",
+                "model_type": "sklearn"
+            },
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
         
         assert response2.json()["data"]["model"]["version"] == 2
     
-    def test_upload_model_no_auth(self, client: TestClient, temp_model_file: str):
+    def test_upload_model_no_auth(self, client: TestClient, model_bytes: bytes):
         """Test model upload without authentication"""
-        with open(temp_model_file, 'rb') as f:
-            response = client.post(
+        response = client.post(
+            "/api/v1/models/upload",
+            data={
+                "name": "test_model",
+                "model_type": "sklearn"
+            },
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
+        
+        assert response.status_code == 401
+    
+    
+    def test_upload_duplicate_content_shares_file(self, client: TestClient, auth_headers: dict, model_bytes: bytes, db: Session):
+        """Test that re-uploading identical content reuses the stored file"""
+        for name in ("original_model", "copied_model"):
+            client.post(
                 "/api/v1/models/upload",
-                data={
-                    "name": "test_model",
-                    "model_type": "sklearn"
-                },
-                files={"file": ("model.pkl", f, "application/octet-stream")}
+                headers=auth_headers,
+                data={"name": name, "model_type": "sklearn"},
+                files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
             )
         
-        assert response.status_code == 401
-
+        original = db.query(Model).filter(Model.name == "original_model").one()
+        copied = db.query(Model).filter(Model.name == "copied_model").one()
+        
+        assert original.content_hash == copied.content_hash
+        assert original.file_path == copied.file_path
+    
+    def test_upload_model_too_large(self, client: TestClient, auth_headers: dict, model_bytes: bytes, monkeypatch):
+        """Test that uploads over MAX_UPLOAD_SIZE_MB are rejected"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_MB", 0)
+        
+        response = client.post(
+            "/api/v1/models/upload",
+            headers=auth_headers,
+            data={
+                "name": "too_large_model",
+                "model_type": "sklearn"
+            },
+            files={"file": ("model.pkl", model_bytes, "application/octet-stream")}
+        )
+        
+        assert response.status_code == 413
+        # The partial upload is discarded
+        incoming_dir = os.path.join(settings.UPLOAD_DIR, ".incoming")
+        assert os.listdir(incoming_dir) == []
 
 class TestModelListing:
     """Test model listing functionality"""
@@ -101,6 +134,24 @@ class TestModelListing:
         assert len(data["data"]) == 1
         assert data["data"][0]["name"] == "test_model"
     
+    def test_list_models_prediction_count(self, client: TestClient, auth_headers: dict, db: Session, test_model: Model):
+        """Test that listed models include their prediction count"""
+        db.execute(insert(Prediction), [
+            {
+                "model_id": test_model.id,
+                "user_id": test_model.user_id,
+                "input_data": {"feature1": 1.0},
+                "status": "success"
+            }
+            for _ in range(3)
+        ])
+        db.commit()
+        
+        response = client.get("/api/v1/models", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["data"][0]["prediction_count"] == 3
+    
     def test_list_models_pagination(self, client: TestClient, auth_headers: dict):
         """Test model listing with pagination"""
         response = client.get(
@@ -113,7 +164,81 @@ class TestModelListing:
         assert "pagination" in data
         assert data["pagination"]["page"] == 1
         assert data["pagination"]["per_page"] == 10
-
+    
+    
+    def test_list_models_cursor_pagination(self, client: TestClient, auth_headers: dict, db: Session, test_user: User):
+        """Test keyset pagination by following next_cursor"""
+        db.execute(insert(Model), [
+            {
+                "user_id": test_user.id,
+                "name": f"model_{i}",
+                "model_type": "sklearn",
+                "version": 1,
+                "file_path": f"/tmp/model_{i}.pkl",
+                "status": "active"
+            }
+            for i in range(3)
+        ])
+        db.commit()
+        
+        response = client.get("/api/v1/models?per_page=2&include_total=true", headers=auth_headers)
+        data = response.json()
+        assert len(data["data"]) == 2
+        assert data["pagination"]["total_items"] == 3
+        next_cursor = data["pagination"]["next_cursor"]
+        assert next_cursor is not None
+        
+        response = client.get(
+            f"/api/v1/models?per_page=2&include_total=true&cursor={next_cursor}",
+            headers=auth_headers
+        )
+        data = response.json()
+        assert len(data["data"]) == 1
+        assert data["pagination"]["next_cursor"] is None
+        assert data["pagination"]["total_items"] == 3
+    
+    def test_list_models_query_count(self, client: TestClient, auth_headers: dict, db: Session, test_user: User, count_queries: list):
+        """Test that listing a page costs a fixed number of queries"""
+        db.execute(insert(Model), [
+            {
+                "user_id": test_user.id,
+                "name": f"model_{i}",
+                "model_type": "sklearn",
+                "version": 1,
+                "file_path": f"/tmp/model_{i}.pkl",
+                "status": "active"
+            }
+            for i in range(5)
+        ])
+        db.commit()
+        count_queries.clear()
+        
+        response = client.get("/api/v1/models", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 5
+        # User lookup, page query, grouped prediction counts
+        assert len(count_queries) <= 3
+    
+    def test_list_models_per_page_limit(self, client: TestClient, auth_headers: dict):
+        """Test that oversized pages are rejected before querying"""
+        response = client.get("/api/v1/models?per_page=1000000", headers=auth_headers)
+        
+        assert response.status_code == 422
+    
+    def test_list_models_total_opt_in(self, client: TestClient, auth_headers: dict, test_model: Model):
+        """Test that totals are only computed when requested"""
+        response = client.get("/api/v1/models", headers=auth_headers)
+        pagination = response.json()["pagination"]
+        
+        assert "total_items" not in pagination
+        assert pagination["has_more"] is False
+    
+    def test_list_models_invalid_cursor(self, client: TestClient, auth_headers: dict):
+        """Test listing with a malformed cursor"""
+        response = client.get("/api/v1/models?cursor=not-a-cursor", headers=auth_headers)
+        
+        assert response.status_code == 400
 
 class TestModelDetails:
     """Test getting model details"""
@@ -178,7 +303,7 @@ class TestModelUpdate:
 class TestModelDeletion:
     """Test model deletion (soft delete)"""
     
-    def test_delete_model(self, client: TestClient, auth_headers: dict, test_model: Model):
+    def test_delete_model(self, client: TestClient, auth_headers: dict, test_model: Model, db: Session):
         """Test soft deleting a model"""
         response = client.delete(
             f"/api/v1/models/{test_model.id}",
@@ -186,6 +311,9 @@ class TestModelDeletion:
         )
         
         assert response.status_code == 204
+        
+        db.refresh(test_model)
+        assert test_model.status == "archived"
     
     def test_delete_model_not_found(self, client: TestClient, auth_headers: dict):
         """Test deleting non-existent model"""
@@ -223,3 +351,43 @@ class TestModelAnalytics:
         assert response.status_code == 200
         data = response.json()
         assert data["data"]["analysis_period_days"] == 30
+    
+    def test_get_analytics_statistics(self, client: TestClient, auth_headers: dict, db: Session, test_model: Model):
+        """Test analytics statistics computed from logged predictions"""
+        db.execute(insert(Prediction), [
+            {
+                "model_id": test_model.id,
+                "user_id": test_model.user_id,
+                "input_data": {"feature1": 1.0},
+                "inference_time_ms": inference_time_ms,
+                "status": status,
+                "error_message": "boom" if status == "failed" else None
+            }
+            for inference_time_ms, status in [(10, "success"), (30, "success"), (None, "failed")]
+        ])
+        db.commit()
+        
+        response = client.get(
+            f"/api/v1/models/{test_model.id}/analytics",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        stats = data["statistics"]
+        assert stats["total_predictions"] == 3
+        assert stats["successful_predictions"] == 2
+        assert stats["failed_predictions"] == 1
+        assert stats["avg_inference_time_ms"] == 20.0
+        assert stats["min_inference_time_ms"] == 10
+        assert stats["max_inference_time_ms"] == 30
+        assert len(data["recent_errors"]) == 1
+    
+    def test_get_analytics_period_limit(self, client: TestClient, auth_headers: dict, test_model: Model):
+        """Test that analysis periods over 90 days are rejected"""
+        response = client.get(
+            f"/api/v1/models/{test_model.id}/analytics?days=365",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 422
@@ -0,0 +1,417 @@
+"""
+Tests for prediction endpoints
+"""
+import os
+import pytest
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.model import Model
+from app.models.prediction import Prediction
+from app.models.user import User
+from app.core.prediction_logger import prediction_logger
+
+
+@pytest.fixture
+def trained_model(db: Session, test_user: User, tmp_path):
+    """Create a model record backed by a fitted two-feature classifier"""
+    X = np.array([[0.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]])
+    y = np.array([0, 0, 1, 1])
+    file_path = tmp_path / "classifier.pkl"
+    joblib.dump(LogisticRegression().fit(X, y), file_path)
+    
+    model = Model(
+        user_id=test_user.id,
+        name="classifier",
+        model_type="sklearn",
+        version=1,
+        file_path=str(file_path),
+        status="active"
+    )
+    db.add(model)
+    db.commit()
+    db.refresh(model)
+    return model
+
+
+@pytest.fixture
+def categorical_model(db: Session, test_user: User, tmp_path):
+    """Create a model record backed by a pipeline that one-hot encodes a string feature"""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import OneHotEncoder
+    
+    X = np.array([["red", 0.0], ["red", 1.0], ["blue", 0.0], ["blue", 1.0]], dtype=object)
+    y = np.array([0, 0, 1, 1])
+    pipeline = make_pipeline(
+        ColumnTransformer([("color", OneHotEncoder(), [0])], remainder="passthrough"),
+        LogisticRegression()
+    )
+    file_path = tmp_path / "categorical.pkl"
+    joblib.dump(pipeline.fit(X, y), file_path)
+    
+    model = Model(
+        user_id=test_user.id,
+        name="categorical",
+        model_type="sklearn",
+        version=1,
+        file_path=str(file_path),
+        status="active"
+    )
+    db.add(model)
+    db.commit()
+    db.refresh(model)
+    return model
+
+
+class TestPredict:
+    """Test real-time predictions"""
+    
+    def test_predict_success(self, client: TestClient, auth_headers: dict, trained_model: Model):
+        """Test a single prediction with probabilities and metadata"""
+        response = client.post(
+            f"/api/v1/predict/{trained_model.id}",
+            headers=auth_headers,
+            json={"input": {"feature1": 1.0, "feature2": 0.0}}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["prediction"]["prediction"] in (0, 1)
+        assert len(data["prediction"]["probabilities"]) == 2
+        assert data["metadata"]["model_id"] == str(trained_model.id)
+        assert isinstance(data["timestamp"], str)
+    
+    def test_predict_invalid_body(self, client: TestClient, auth_headers: dict, trained_model: Model):
+        """Test that malformed prediction bodies are rejected with 422"""
+        response = client.post(
+            f"/api/v1/predict/{trained_model.id}",
+            headers=auth_headers,
+            json={"input": [1.0, 0.0]}
+        )
+        
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "input"]
+    
+    def test_predict_categorical_features(self, client: TestClient, auth_headers: dict, categorical_model: Model):
+        """Test that string features reach pipelines with encoders unchanged"""
+        response = client.post(
+            f"/api/v1/predict/{categorical_model.id}",
+            headers=auth_headers,
+            json={"input": {"color": "blue", "size": 1.0}}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["data"]["prediction"]["prediction"] == 1
+    
+    def test_predict_uses_result_cache(self, client: TestClient, auth_headers: dict, trained_model: Model):
+        """Test that a repeated input is served from the prediction cache"""
+        from app.core.prediction_cache import PredictionCache, get_prediction_cache
+        from app.main import app
+        
+        store = {}
+        
+        class FakeRedis:
+            def get(self, key):
+                return store.get(key)
+            
+            def set(self, key, value, ex=None):
+                store[key] = value
+        
+        cache = PredictionCache(FakeRedis())
+        app.dependency_overrides[get_prediction_cache] = lambda: cache
+        
+        def predict(input_data):
+            response = client.post(
+                f"/api/v1/predict/{trained_model.id}",
+                headers=auth_headers,
+                json={"input": input_data}
+            )
+            assert response.status_code == 200
+            return response.json()["data"]
+        
+        responses = [predict({"feature1": 1.0, "feature2": 0.0}) for _ in range(2)]
+        
+        assert responses[0]["metadata"]["result_cached"] is False
+        assert responses[1]["metadata"]["result_cached"] is True
+        assert responses[1]["prediction"] == responses[0]["prediction"]
+        
+        # Key order decides feature order, so reordered keys are a new input
+        assert predict({"feature2": 0.0, "feature1": 1.0})["metadata"]["result_cached"] is False
+        
+        # Inputs orjson can't serialize skip the cache instead of failing
+        assert predict({"feature1": 2 ** 70, "feature2": 0.0})["metadata"]["result_cached"] is False
+
+
+class TestPredictionHistory:
+    """Test prediction history listing"""
+    
+    def test_history_empty(self, client: TestClient, auth_headers: dict):
+        """Test history when no predictions exist"""
+        response = client.get("/api/v1/predict/history", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["data"] == []
+    
+    def test_history_cursor_pagination(self, client: TestClient, auth_headers: dict, db: Session, test_model: Model):
+        """Test paging through history with next_cursor"""
+        db.execute(insert(Prediction), [
+            {
+                "model_id": test_model.id,
+                "user_id": test_model.user_id,
+                "input_data": {"feature1": float(i)},
+                "output_data": {"prediction": i},
+                "inference_time_ms": 5,
+                "status": "success"
+            }
+            for i in range(3)
+        ])
+        db.commit()
+        
+        response = client.get("/api/v1/predict/history?per_page=2&include_total=true", headers=auth_headers)
+        data = response.json()
+        assert len(data["data"]) == 2
+        assert data["data"][0]["model_name"] == "test_model"
+        assert data["pagination"]["total_items"] == 3
+        next_cursor = data["pagination"]["next_cursor"]
+        
+        response = client.get(
+            f"/api/v1/predict/history?per_page=2&include_total=true&cursor={next_cursor}",
+            headers=auth_headers
+        )
+        data = response.json()
+        assert len(data["data"]) == 1
+        assert data["pagination"]["next_cursor"] is None
+        assert data["pagination"]["total_items"] == 3
+
+
+class TestBatchPredict:
+    """Test batch predictions"""
+    
+    def test_predict_batch(self, client: TestClient, auth_headers: dict, db: Session, trained_model: Model):
+        """Test batch predictions return one result per input and are logged"""
+        response = client.post(
+            f"/api/v1/predict/{trained_model.id}/batch",
+            headers=auth_headers,
+            json={"inputs": [
+                {"feature1": 0.0, "feature2": 0.0},
+                [1.0, 1.0],
+                {"feature1": 1.0, "feature2": 0.0}
+            ]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert len(data["predictions"]) == 3
+        assert data["metadata"]["batch_size"] == 3
+        assert all(len(result["probabilities"]) == 2 for result in data["predictions"])
+        prediction_logger.flush()
+        assert db.query(Prediction).filter(Prediction.model_id == trained_model.id).count() == 3
+    
+    def test_predict_batch_ragged_inputs(self, client: TestClient, auth_headers: dict, trained_model: Model):
+        """Test that inputs with different feature counts are rejected"""
+        response = client.post(
+            f"/api/v1/predict/{trained_model.id}/batch",
+            headers=auth_headers,
+            json={"inputs": [[0.0, 1.0], [1.0]]}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_predict_batch_too_many_inputs(self, client: TestClient, auth_headers: dict, trained_model: Model, monkeypatch):
+        """Test that batches over MAX_BATCH_PREDICTION_SIZE are rejected as invalid"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "MAX_BATCH_PREDICTION_SIZE", 1)
+        
+        response = client.post(
+            f"/api/v1/predict/{trained_model.id}/batch",
+            headers=auth_headers,
+            json={"inputs": [[0.0, 1.0], [1.0, 0.0]]}
+        )
+        
+        assert response.status_code == 422
+    
+    def test_predict_batch_failure_is_logged(self, client: TestClient, auth_headers: dict, db: Session, trained_model: Model):
+        """Test that a failed batch records one failed prediction per input"""
+        response = client.post(
+            f"/api/v1/predict/{trained_model.id}/batch",
+            headers=auth_headers,
+            json={"inputs": [[0.0, 1.0, 2.0], [1.0, 0.0, 2.0]]}
+        )
+        
+        assert response.status_code == 500
+        prediction_logger.flush()
+        statuses = db.scalars(
+            select(Prediction.status).where(Prediction.model_id == trained_model.id)
+        ).all()
+        assert statuses == ["failed", "failed"]
+
+
+class TestModelLoader:
+    """Test model loading and caching"""
+    
+    def test_loader_casts_linear_weights_to_float32(self, trained_model: Model):
+        """Test that loaded linear models predict in float32"""
+        from app.core.model_loader import ModelLoader
+        
+        model = ModelLoader().load_model(trained_model.file_path, str(trained_model.id))
+        
+        assert model.coef_.dtype == np.float32
+        assert model.predict_proba(np.ones((1, 2), dtype=np.float32)).dtype == np.float32
+    
+    def test_loader_memory_maps_model_arrays(self, trained_model: Model):
+        """Test that arrays in uncompressed joblib files are mapped, not copied"""
+        from app.core.model_loader import ModelLoader
+        
+        model = ModelLoader(cast_float32=False).load_model(trained_model.file_path, str(trained_model.id))
+        
+        assert isinstance(model.coef_, np.memmap)
+        assert model.predict(np.ones((1, 2), dtype=np.float32)).shape == (1,)
+    
+    def test_loader_caches_until_file_changes(self, trained_model: Model):
+        """Test that the loader serves hits from memory and reloads modified files"""
+        from app.core.model_loader import ModelLoader
+        
+        loader = ModelLoader()
+        assert not loader.is_model_cached(trained_model.file_path)
+        
+        first = loader.load_model(trained_model.file_path, str(trained_model.id))
+        assert loader.is_model_cached(trained_model.file_path)
+        assert loader.load_model(trained_model.file_path, str(trained_model.id)) is first
+        
+        stat = os.stat(trained_model.file_path)
+        os.utime(trained_model.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert loader.load_model(trained_model.file_path, str(trained_model.id)) is not first
+        assert loader.cache_info().misses == 2
+    
+    def test_loader_switches_to_compiled_onnx_model(self, trained_model: Model, monkeypatch):
+        """Test that a cached model is reloaded once its ONNX variant is written"""
+        from app.core import model_loader as model_loader_module
+        from app.core.model_compiler import onnx_path_for
+        
+        onnx_path = onnx_path_for(trained_model.file_path)
+        compiled = object()
+        monkeypatch.setattr(
+            model_loader_module, "load_onnx_model",
+            lambda path: compiled if os.path.exists(onnx_path_for(path)) else None
+        )
+        
+        loader = model_loader_module.ModelLoader()
+        assert loader.load_model(trained_model.file_path, str(trained_model.id)) is not compiled
+        
+        with open(onnx_path, "wb") as f:
+            f.write(b"onnx")
+        try:
+            assert not loader.is_model_cached(trained_model.file_path)
+            assert loader.load_model(trained_model.file_path, str(trained_model.id)) is compiled
+            assert loader.cache_info().currsize == 1
+        finally:
+            os.remove(onnx_path)
+    
+    def test_loader_evicts_least_recently_used(self, trained_model: Model, tmp_path):
+        """Test that a model in use survives eviction even if it was loaded first"""
+        from app.core.model_loader import ModelLoader
+        
+        paths = [trained_model.file_path]
+        for name in ("b.pkl", "c.pkl"):
+            paths.append(str(tmp_path / name))
+            joblib.dump(joblib.load(trained_model.file_path), paths[-1])
+        hot, cold, new = paths
+        
+        loader = ModelLoader(cache_size=2)
+        for path in (hot, cold, hot, new):
+            loader.load_model(path, path)
+        
+        assert loader.is_model_cached(hot)
+        assert not loader.is_model_cached(cold)
+        assert loader.cache_info().hits == 1
+        loader.load_model(hot, hot)
+        assert loader.cache_info().hits == 2
+    
+    def test_loader_loads_cold_model_once_under_concurrency(self, trained_model: Model, monkeypatch):
+        """Test that concurrent requests for a cold model share a single load"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app.core import model_loader as model_loader_module
+        
+        real_load = joblib.load
+        
+        def slow_load(path, **kwargs):
+            time.sleep(0.05)
+            return real_load(path, **kwargs)
+        
+        monkeypatch.setattr(model_loader_module.joblib, "load", slow_load)
+        loader = model_loader_module.ModelLoader()
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            models = list(pool.map(
+                lambda _: loader.load_model(trained_model.file_path, str(trained_model.id)),
+                range(8)
+            ))
+        
+        assert loader.cache_info().misses == 1
+        assert all(model is models[0] for model in models)
+    
+    def test_loader_loads_modified_model_once_under_concurrency(self, trained_model: Model, monkeypatch):
+        """Test that concurrent requests for a replaced model file share a single reload"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app.core import model_loader as model_loader_module
+        
+        loader = model_loader_module.ModelLoader()
+        loader.load_model(trained_model.file_path, str(trained_model.id))
+        
+        stat = os.stat(trained_model.file_path)
+        os.utime(trained_model.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert not loader.is_model_cached(trained_model.file_path)
+        
+        real_load = joblib.load
+        
+        def slow_load(path, **kwargs):
+            time.sleep(0.05)
+            return real_load(path, **kwargs)
+        
+        monkeypatch.setattr(model_loader_module.joblib, "load", slow_load)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            models = list(pool.map(
+                lambda _: loader.load_model(trained_model.file_path, str(trained_model.id)),
+                range(8)
+            ))
+        
+        assert loader.cache_info().misses == 2
+        assert all(model is models[0] for model in models)
+    
+    def test_loader_releases_cache_under_memory_pressure(self, trained_model: Model, tmp_path, monkeypatch):
+        """Test that the least recently used models are dropped until enough memory is free"""
+        from types import SimpleNamespace
+        from app.core import model_loader as model_loader_module
+        
+        paths = [trained_model.file_path]
+        for name in ("b.pkl", "c.pkl"):
+            paths.append(str(tmp_path / name))
+            joblib.dump(joblib.load(trained_model.file_path), paths[-1])
+        oldest, recent, new = paths
+        
+        loader = model_loader_module.ModelLoader(memory_free_threshold_mb=512)
+        loader.load_model(oldest, oldest)
+        loader.load_model(recent, recent)
+        
+        # Each released model frees 300MB: dropping one of two is enough
+        monkeypatch.setattr(
+            model_loader_module, "psutil",
+            SimpleNamespace(virtual_memory=lambda: SimpleNamespace(
+                available=(3 - loader.cache_info().currsize) * 300 * 1024 * 1024
+            ))
+        )
+        loader.load_model(new, new)
+        
+        assert not loader.is_model_cached(oldest)
+        assert loader.is_model_cached(recent)
+        assert loader.is_model_cached(new)